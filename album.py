@@ -0,0 +1,71 @@
+# album.py
+import asyncio
+from config import ALBUM_WINDOW, logger
+
+# Telegram membatasi satu album paling banyak 10 media
+ALBUM_MAX_SIZE = 10
+
+class AlbumAggregator:
+    """
+    Mengumpulkan bagian album Telegram (event dengan grouped_id yang sama) menjadi satu album.
+
+    Setiap bagian album datang sebagai event terpisah. Bagian ditahan sampai tidak ada bagian
+    baru selama `window` detik (atau album sudah berisi 10 media), lalu semua event album
+    diserahkan sekaligus ke `on_album`.
+    """
+
+    def __init__(self, on_album, window=ALBUM_WINDOW):
+        """
+        Args:
+            on_album (callable): Fungsi async(events) yang menerima semua event satu album, urut ID pesan.
+            window (float): Lama menunggu bagian album berikutnya dalam detik.
+        """
+        self.on_album = on_album
+        self.window = window
+        self._albums = {}  # (chat_id, grouped_id) -> daftar event
+        self._timers = {}
+        self._tasks = set()  # Referensi kuat ke tugas flush yang sedang berjalan
+        self.albums = 0
+        self.parts = 0
+
+    def add(self, event):
+        """
+        Menambahkan satu bagian album.
+
+        Args:
+            event: Event NewMessage dengan message.grouped_id.
+        """
+        key = (event.chat_id, event.message.grouped_id)
+        parts = self._albums.setdefault(key, [])
+        parts.append(event)
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        delay = 0 if len(parts) >= ALBUM_MAX_SIZE else self.window
+        self._timers[key] = asyncio.get_running_loop().call_later(delay, self._spawn_flush, key)
+
+    def _spawn_flush(self, key):
+        task = asyncio.ensure_future(self._flush(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, key):
+        self._timers.pop(key, None)
+        parts = self._albums.pop(key, None)
+        if not parts:
+            return
+        parts.sort(key=lambda e: e.message.id)
+        self.albums += 1
+        self.parts += len(parts)
+        logger.info(f"Album {key[1]} dari {key[0]} dikumpulkan: {len(parts)} media")
+        try:
+            await self.on_album(parts)
+        except Exception as e:
+            logger.error(f"Gagal memproses album {key[1]} dari {key[0]}: {str(e)}")
+
+    def stats(self):
+        return {
+            'albums': self.albums,
+            'parts': self.parts,
+            'pending': len(self._albums),
+        }
@@ -0,0 +1,99 @@
+# command_dispatcher.py
+import re
+from telethon import events
+from config import ADMINS, logger
+
+_COMMAND_TOKEN = re.compile(r'/\w+')
+
+class CommandDispatcher:
+    """
+    Satu handler untuk semua perintah admin.
+
+    Handler hanya didaftarkan untuk chat pribadi dari ADMINS, sehingga pesan lain tidak
+    pernah melewati parsing perintah. Perintah dicari lewat tabel prefiks (awalan terpanjang
+    yang terdaftar), lalu hanya pola milik perintah itu yang dicocokkan untuk mengisi
+    `event.pattern_match` seperti pada handler Telethon biasa.
+    """
+
+    def __init__(self, admins=None):
+        """
+        Args:
+            admins (list, optional): Daftar ID admin yang boleh menjalankan perintah.
+        """
+        self.admins = list(ADMINS if admins is None else admins)
+        self._commands = {}  # prefiks perintah -> (handler, pola terkompilasi)
+        self._patterns = []  # pola tanpa prefiks perintah, misalnya kode verifikasi
+        self.dispatched = 0
+        self.unknown = 0
+
+    def command(self, prefix, handler, pattern=None):
+        """
+        Mendaftarkan handler untuk prefiks perintah.
+
+        Args:
+            prefix (str): Prefiks perintah, misalnya '/addvip'.
+            handler (callable): Fungsi async(event).
+            pattern (str, optional): Regex lengkap untuk argumen; default hanya prefiks.
+        """
+        self._commands[prefix] = (handler, re.compile(pattern or re.escape(prefix)))
+
+    def pattern(self, handler, pattern):
+        """
+        Mendaftarkan handler untuk pesan non-perintah yang cocok dengan regex.
+
+        Args:
+            handler (callable): Fungsi async(event).
+            pattern (str): Regex yang harus cocok dari awal pesan.
+        """
+        self._patterns.append((handler, re.compile(pattern)))
+
+    def _lookup(self, text):
+        token = _COMMAND_TOKEN.match(text)
+        if token is None:
+            return None
+        token = token.group(0)
+        # Awalan terpanjang yang terdaftar, misalnya '/addunfilterch@nama' -> '/addunfilterch'
+        for end in range(len(token), 1, -1):
+            entry = self._commands.get(token[:end])
+            if entry is not None:
+                return entry
+        return None
+
+    async def dispatch(self, event):
+        """
+        Menjalankan handler yang sesuai untuk pesan admin.
+
+        Args:
+            event: Event NewMessage dari Telethon.
+        """
+        text = event.raw_text or ""
+        if text.startswith('/'):
+            entry = self._lookup(text)
+            candidates = [entry] if entry is not None else []
+        else:
+            candidates = self._patterns
+
+        for handler, pattern in candidates:
+            match = pattern.match(text)
+            if match is None:
+                continue
+            event.pattern_match = match
+            self.dispatched += 1
+            try:
+                await handler(event)
+            except Exception as e:
+                logger.error(f"Galat menjalankan perintah {text.split()[0]}: {str(e)}")
+                await event.reply(f"Gagal menjalankan perintah: {str(e)}")
+            return
+        if text.startswith('/'):
+            self.unknown += 1
+
+    def register(self, client):
+        """
+        Mendaftarkan dispatcher ke klien Telegram, terbatas pada chat pribadi admin.
+
+        Args:
+            client: Objek TelegramClient.
+        """
+        client.add_event_handler(self.dispatch, events.NewMessage(from_users=self.admins, func=lambda e: e.is_private))
+        logger.info(f"Dispatcher perintah admin terdaftar: {len(self._commands)} perintah untuk {len(self.admins)} admin")
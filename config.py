@@ -1,3 +1,4 @@
+import asyncio
 import os
 import json
 import logging
@@ -14,6 +15,74 @@ GOOGLE_API_KEY = None
 DISCORD_AUTH_TOKEN = None
 DISCORD_THREAD_ID = None
 
+# Pengaturan cache terjemahan (opsional, dapat diubah lewat .env)
+TRANSLATION_CACHE_SIZE = 2000
+TRANSLATION_CACHE_TTL = 7 * 24 * 3600
+TRANSLATION_CACHE_PATH = 'translation_cache.db'
+
+# Pengaturan router penyedia terjemahan
+TRANSLATION_HEDGE_ENABLED = True
+TRANSLATION_CIRCUIT_COOLDOWN = 60
+
+# Jeda minimum antar pengiriman ke Discord dalam detik (0 = hanya ikuti header rate limit)
+DISCORD_MIN_SEND_INTERVAL = 0.0
+
+# Lama maksimum (detik) menunggu pesan teks lain untuk digabung menjadi satu pesan Discord
+DISCORD_BATCH_LINGER = 1.0
+
+# Lokasi database outbox persisten untuk pesan Discord yang belum terkirim
+OUTBOX_PATH = 'outbox.db'
+
+# Batas antrian Discord per tujuan dan per tingkat prioritas, serta kebijakan saat penuh
+# (drop_oldest, drop_lowest_tier, atau spill ke outbox di disk)
+DISCORD_QUEUE_CAPACITY = 500
+DISCORD_TIER_CAPACITY = 200
+DISCORD_OVERFLOW_POLICY = 'spill'
+# Rasio keterisian antrian yang dianggap jenuh (memicu backpressure di forward_message)
+DISCORD_BACKPRESSURE_RATIO = 0.8
+
+# Jumlah pekerja per tahap pipeline penerusan dan kapasitas antrian tiap pekerja
+PIPELINE_WORKERS = 4
+PIPELINE_TRANSLATE_WORKERS = 8
+PIPELINE_QUEUE_SIZE = 100
+
+# Jendela deduplikasi pesan yang sudah diteruskan (jumlah maksimum dan umur dalam detik)
+DEDUP_MAX_SIZE = 10000
+DEDUP_TTL = 24 * 60 * 60
+DEDUP_PATH = 'dedup_snapshot.json'
+
+# Penekanan berita hampir sama lintas channel: jarak Hamming SimHash maksimum (0 = nonaktif)
+# dan lama jendela waktu dalam detik
+NEAR_DUP_THRESHOLD = 5
+NEAR_DUP_WINDOW = 300
+
+# Cache username/judul channel untuk perintah admin (umur entri dalam detik)
+ENTITY_CACHE_TTL = 24 * 60 * 60
+ENTITY_CACHE_PATH = 'entity_cache.json'
+
+# Anggaran memori untuk media yang menunggu diunggah ke Discord, dan ukuran media
+# yang selalu ditulis ke disk (byte)
+MEDIA_MEMORY_BUDGET = 64 * 1024 * 1024
+MEDIA_SPILL_THRESHOLD = 8 * 1024 * 1024
+
+# Lama menunggu bagian album (grouped media) berikutnya sebelum album diproses, dalam detik
+ALBUM_WINDOW = 1.0
+
+# Kompresi ulang gambar sebelum diunggah ke Discord (butuh Pillow): sisi terpanjang maksimum
+# dalam piksel, kualitas JPEG, dan jumlah proses pekerja
+IMAGE_RECOMPRESS_ENABLED = True
+IMAGE_MAX_DIMENSION = 2048
+IMAGE_JPEG_QUALITY = 85
+IMAGE_PROCESS_WORKERS = 2
+
+# Cache media beralamat konten: total ukuran gambar di memori (byte) dan umur maksimum
+# URL lampiran Discord yang dipakai ulang (detik)
+MEDIA_CACHE_SIZE = 128 * 1024 * 1024
+MEDIA_URL_TTL = 12 * 60 * 60
+
+# Batas laju pengiriman ke TARGET_CHANNEL (pesan per menit, 0 = tanpa batas di sisi klien)
+TELEGRAM_SEND_RATE = 20
+
 FILTERED_CHANNELS = []
 UNFILTERED_CHANNELS = []
 VIP_CHANNELS = []
@@ -22,9 +91,22 @@ IMAGE_CHANNELS = []  # Daftar baru untuk channel gambar
 KEYWORDS = []
 SUMMARY_KEYWORDS = []
 
+# Aturan tujuan Discord per kategori channel atau per chat_id (dari discord_routes.json).
+# Nilai tujuan berupa ID thread/channel Discord atau URL webhook.
+DISCORD_ROUTES = {'categories': {}, 'chats': {}}
+
 def load_env():
     """Memuat variabel lingkungan dari file .env."""
     global API_ID, API_HASH, PHONE, ADMINS, TARGET_CHANNEL, GOOGLE_API_KEY, DISCORD_AUTH_TOKEN, DISCORD_THREAD_ID
+    global TRANSLATION_CACHE_SIZE, TRANSLATION_CACHE_TTL, TRANSLATION_CACHE_PATH
+    global TRANSLATION_HEDGE_ENABLED, TRANSLATION_CIRCUIT_COOLDOWN, DISCORD_MIN_SEND_INTERVAL
+    global DISCORD_BATCH_LINGER, OUTBOX_PATH
+    global DISCORD_QUEUE_CAPACITY, DISCORD_TIER_CAPACITY, DISCORD_OVERFLOW_POLICY, DISCORD_BACKPRESSURE_RATIO
+    global PIPELINE_WORKERS, PIPELINE_TRANSLATE_WORKERS, PIPELINE_QUEUE_SIZE
+    global DEDUP_MAX_SIZE, DEDUP_TTL, DEDUP_PATH, NEAR_DUP_THRESHOLD, NEAR_DUP_WINDOW
+    global ENTITY_CACHE_TTL, ENTITY_CACHE_PATH, MEDIA_MEMORY_BUDGET, MEDIA_SPILL_THRESHOLD, ALBUM_WINDOW
+    global IMAGE_RECOMPRESS_ENABLED, IMAGE_MAX_DIMENSION, IMAGE_JPEG_QUALITY, IMAGE_PROCESS_WORKERS
+    global MEDIA_CACHE_SIZE, MEDIA_URL_TTL, TELEGRAM_SEND_RATE
     load_dotenv()
     
     api_id_str = os.getenv('TELEGRAM_API_ID')
@@ -63,6 +145,98 @@ def load_env():
     DISCORD_AUTH_TOKEN = discord_auth_token
     DISCORD_THREAD_ID = discord_thread_id
 
+    try:
+        TRANSLATION_CACHE_SIZE = int(os.getenv('TRANSLATION_CACHE_SIZE', TRANSLATION_CACHE_SIZE))
+        TRANSLATION_CACHE_TTL = int(os.getenv('TRANSLATION_CACHE_TTL', TRANSLATION_CACHE_TTL))
+    except ValueError:
+        raise ValueError("TRANSLATION_CACHE_SIZE dan TRANSLATION_CACHE_TTL harus berupa angka integer.")
+    TRANSLATION_CACHE_PATH = os.getenv('TRANSLATION_CACHE_PATH', TRANSLATION_CACHE_PATH)
+
+    TRANSLATION_HEDGE_ENABLED = os.getenv('TRANSLATION_HEDGE_ENABLED', 'true').strip().lower() in ('1', 'true', 'yes')
+    try:
+        TRANSLATION_CIRCUIT_COOLDOWN = int(os.getenv('TRANSLATION_CIRCUIT_COOLDOWN', TRANSLATION_CIRCUIT_COOLDOWN))
+    except ValueError:
+        raise ValueError("TRANSLATION_CIRCUIT_COOLDOWN harus berupa angka integer.")
+
+    try:
+        DISCORD_MIN_SEND_INTERVAL = float(os.getenv('DISCORD_MIN_SEND_INTERVAL', DISCORD_MIN_SEND_INTERVAL))
+    except ValueError:
+        raise ValueError("DISCORD_MIN_SEND_INTERVAL harus berupa angka.")
+
+    try:
+        DISCORD_BATCH_LINGER = float(os.getenv('DISCORD_BATCH_LINGER', DISCORD_BATCH_LINGER))
+    except ValueError:
+        raise ValueError("DISCORD_BATCH_LINGER harus berupa angka.")
+    OUTBOX_PATH = os.getenv('OUTBOX_PATH', OUTBOX_PATH)
+
+    try:
+        DISCORD_QUEUE_CAPACITY = int(os.getenv('DISCORD_QUEUE_CAPACITY', DISCORD_QUEUE_CAPACITY))
+        DISCORD_TIER_CAPACITY = int(os.getenv('DISCORD_TIER_CAPACITY', DISCORD_TIER_CAPACITY))
+        DISCORD_BACKPRESSURE_RATIO = float(os.getenv('DISCORD_BACKPRESSURE_RATIO', DISCORD_BACKPRESSURE_RATIO))
+    except ValueError:
+        raise ValueError("DISCORD_QUEUE_CAPACITY, DISCORD_TIER_CAPACITY, dan DISCORD_BACKPRESSURE_RATIO harus berupa angka.")
+    DISCORD_OVERFLOW_POLICY = os.getenv('DISCORD_OVERFLOW_POLICY', DISCORD_OVERFLOW_POLICY).strip().lower()
+    if DISCORD_OVERFLOW_POLICY not in ('drop_oldest', 'drop_lowest_tier', 'spill'):
+        raise ValueError("DISCORD_OVERFLOW_POLICY harus salah satu dari: drop_oldest, drop_lowest_tier, spill.")
+
+    try:
+        PIPELINE_WORKERS = max(1, int(os.getenv('PIPELINE_WORKERS', PIPELINE_WORKERS)))
+        PIPELINE_TRANSLATE_WORKERS = max(1, int(os.getenv('PIPELINE_TRANSLATE_WORKERS', PIPELINE_TRANSLATE_WORKERS)))
+        PIPELINE_QUEUE_SIZE = max(1, int(os.getenv('PIPELINE_QUEUE_SIZE', PIPELINE_QUEUE_SIZE)))
+    except ValueError:
+        raise ValueError("PIPELINE_WORKERS, PIPELINE_TRANSLATE_WORKERS, dan PIPELINE_QUEUE_SIZE harus berupa angka integer.")
+
+    try:
+        DEDUP_MAX_SIZE = max(1, int(os.getenv('DEDUP_MAX_SIZE', DEDUP_MAX_SIZE)))
+        DEDUP_TTL = int(os.getenv('DEDUP_TTL', DEDUP_TTL))
+    except ValueError:
+        raise ValueError("DEDUP_MAX_SIZE dan DEDUP_TTL harus berupa angka integer.")
+    DEDUP_PATH = os.getenv('DEDUP_PATH', DEDUP_PATH)
+
+    try:
+        NEAR_DUP_THRESHOLD = int(os.getenv('NEAR_DUP_THRESHOLD', NEAR_DUP_THRESHOLD))
+        NEAR_DUP_WINDOW = int(os.getenv('NEAR_DUP_WINDOW', NEAR_DUP_WINDOW))
+    except ValueError:
+        raise ValueError("NEAR_DUP_THRESHOLD dan NEAR_DUP_WINDOW harus berupa angka integer.")
+    if not 0 <= NEAR_DUP_THRESHOLD <= 31:
+        raise ValueError("NEAR_DUP_THRESHOLD harus antara 0 dan 31.")
+
+    try:
+        ENTITY_CACHE_TTL = int(os.getenv('ENTITY_CACHE_TTL', ENTITY_CACHE_TTL))
+    except ValueError:
+        raise ValueError("ENTITY_CACHE_TTL harus berupa angka integer.")
+    ENTITY_CACHE_PATH = os.getenv('ENTITY_CACHE_PATH', ENTITY_CACHE_PATH)
+
+    try:
+        MEDIA_MEMORY_BUDGET = int(os.getenv('MEDIA_MEMORY_BUDGET', MEDIA_MEMORY_BUDGET))
+        MEDIA_SPILL_THRESHOLD = int(os.getenv('MEDIA_SPILL_THRESHOLD', MEDIA_SPILL_THRESHOLD))
+    except ValueError:
+        raise ValueError("MEDIA_MEMORY_BUDGET dan MEDIA_SPILL_THRESHOLD harus berupa angka integer.")
+
+    try:
+        ALBUM_WINDOW = float(os.getenv('ALBUM_WINDOW', ALBUM_WINDOW))
+    except ValueError:
+        raise ValueError("ALBUM_WINDOW harus berupa angka.")
+
+    IMAGE_RECOMPRESS_ENABLED = os.getenv('IMAGE_RECOMPRESS_ENABLED', 'true').strip().lower() in ('1', 'true', 'yes')
+    try:
+        IMAGE_MAX_DIMENSION = max(1, int(os.getenv('IMAGE_MAX_DIMENSION', IMAGE_MAX_DIMENSION)))
+        IMAGE_JPEG_QUALITY = min(95, max(1, int(os.getenv('IMAGE_JPEG_QUALITY', IMAGE_JPEG_QUALITY))))
+        IMAGE_PROCESS_WORKERS = max(1, int(os.getenv('IMAGE_PROCESS_WORKERS', IMAGE_PROCESS_WORKERS)))
+    except ValueError:
+        raise ValueError("IMAGE_MAX_DIMENSION, IMAGE_JPEG_QUALITY, dan IMAGE_PROCESS_WORKERS harus berupa angka integer.")
+
+    try:
+        MEDIA_CACHE_SIZE = int(os.getenv('MEDIA_CACHE_SIZE', MEDIA_CACHE_SIZE))
+        MEDIA_URL_TTL = int(os.getenv('MEDIA_URL_TTL', MEDIA_URL_TTL))
+    except ValueError:
+        raise ValueError("MEDIA_CACHE_SIZE dan MEDIA_URL_TTL harus berupa angka integer.")
+
+    try:
+        TELEGRAM_SEND_RATE = max(0, int(os.getenv('TELEGRAM_SEND_RATE', TELEGRAM_SEND_RATE)))
+    except ValueError:
+        raise ValueError("TELEGRAM_SEND_RATE harus berupa angka integer.")
+
 def setup_logging():
     """Mengatur logging untuk aplikasi dengan rotasi file."""
     handler = RotatingFileHandler('telegram_forwarder.log', maxBytes=5*1024*1024, backupCount=5)
@@ -80,46 +254,285 @@ def setup_logging():
     
     return logger
 
+def _normalize_channel_id(ch):
+    return int(ch) if int(ch) < 0 else -1000000000000 - int(ch)
+
+def _parse_channels(data):
+    return {name: [_normalize_channel_id(ch) for ch in data.get(name, [])] for name in CHANNEL_LIST_NAMES}
+
+def _apply_channels(parsed):
+    for name, channels in parsed.items():
+        globals()[name][:] = channels
+    logger.info(f"Loaded channels: FILTERED={FILTERED_CHANNELS}, UNFILTERED={UNFILTERED_CHANNELS}, VIP={VIP_CHANNELS}, SUMMARY={SUMMARY_CHANNELS}, IMAGE={IMAGE_CHANNELS}")
+
+def _dump_channels():
+    return {name: list(globals()[name]) for name in CHANNEL_LIST_NAMES}
+
+def _parse_keywords(data):
+    return [str(kw).strip() for kw in data.get('KEYWORDS', [])]
+
+def _apply_keywords(parsed):
+    KEYWORDS[:] = parsed
+    logger.info(f"Loaded keywords: {KEYWORDS}")
+
+def _dump_keywords():
+    return {'KEYWORDS': list(KEYWORDS)}
+
+def _parse_summary_keywords(data):
+    return [str(kw).strip() for kw in data.get('SUMMARY_KEYWORDS', [])]
+
+def _apply_summary_keywords(parsed):
+    SUMMARY_KEYWORDS[:] = parsed
+    logger.info(f"Loaded summary keywords: {SUMMARY_KEYWORDS}")
+
+def _dump_summary_keywords():
+    return {'SUMMARY_KEYWORDS': list(SUMMARY_KEYWORDS)}
+
+def _parse_discord_routes(data):
+    categories = {str(k).upper(): str(v).strip() for k, v in data.get('categories', {}).items() if str(v).strip()}
+    chats = {_normalize_channel_id(k): str(v).strip() for k, v in data.get('chats', {}).items() if str(v).strip()}
+    return {'categories': categories, 'chats': chats}
+
+def redact_discord_target(target):
+    """
+    Menyamarkan URL webhook (yang memuat token rahasia) menjadi 'webhook <id>' untuk log.
+
+    Args:
+        target (str): ID thread/channel Discord atau URL webhook.
+
+    Returns:
+        str: Target yang aman untuk ditulis ke log.
+    """
+    if '/webhooks/' not in target:
+        return target
+    return f"webhook {target.split('/webhooks/', 1)[-1].split('/', 1)[0]}"
+
+def _apply_discord_routes(parsed):
+    DISCORD_ROUTES['categories'] = parsed['categories']
+    DISCORD_ROUTES['chats'] = parsed['chats']
+    redacted = {section: {key: redact_discord_target(target) for key, target in rules.items()} for section, rules in DISCORD_ROUTES.items()}
+    logger.info(f"Loaded Discord routes: {redacted}")
+
+CHANNEL_LIST_NAMES = ('FILTERED_CHANNELS', 'UNFILTERED_CHANNELS', 'VIP_CHANNELS', 'SUMMARY_CHANNELS', 'IMAGE_CHANNELS')
+
+# File konfigurasi -> (parser, penerap ke state di memori, pembuat isi file; None = hanya dibaca)
+CONFIG_FILES = {
+    'channels.json': (_parse_channels, _apply_channels, _dump_channels),
+    'keywords.json': (_parse_keywords, _apply_keywords, _dump_keywords),
+    'summary_keywords.json': (_parse_summary_keywords, _apply_summary_keywords, _dump_summary_keywords),
+    'discord_routes.json': (_parse_discord_routes, _apply_discord_routes, None),
+}
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def _read_config_file(name):
+    parser = CONFIG_FILES[name][0]
+    signature = _file_signature(name)
+    with open(name, 'r') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError("isi file harus berupa objek JSON")
+    return parser(data), signature
+
+def write_json_atomic(path, data):
+    """
+    Menulis data JSON ke file secara atomik: file sementara di-fsync lalu di-rename,
+    sehingga crash atau mati listrik tidak meninggalkan file kosong atau terpotong.
+
+    Args:
+        path (str): Lokasi file tujuan.
+        data: Data yang dapat diserialisasi ke JSON.
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def _write_config_file(name, data):
+    write_json_atomic(name, data)
+    return _file_signature(name)
+
+class ConfigStore:
+    """
+    State konfigurasi terpadu dengan penyimpanan write-behind dan hot reload.
+
+    Perubahan dari perintah admin langsung berlaku di memori (daftar di modul ini diubah
+    di tempat) dan menaikkan versi. Penulisan ke disk ditunda sebentar agar beberapa
+    perubahan beruntun cukup ditulis sekali, dilakukan di thread terpisah, dan atomik lewat
+    file sementara + rename sehingga crash tidak pernah meninggalkan file terpotong.
+    File juga dipantau; perubahan dari luar dimuat ulang lalu pendengar diberi tahu agar
+    indeks routing dan kata kunci dibangun ulang tanpa restart.
+    """
+
+    def __init__(self, debounce=1.0, poll_interval=2.0):
+        """
+        Args:
+            debounce (float): Jeda sebelum perubahan ditulis ke disk, dalam detik.
+            poll_interval (float): Jeda antar pemeriksaan perubahan file, dalam detik.
+        """
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.version = 0
+        self.reloads = 0
+        self._dirty = set()
+        self._flush_handle = None
+        self._flushing = None
+        self._watch_task = None
+        self._tasks = set()  # Referensi kuat ke tugas flush latar belakang
+        self._signatures = {}  # nama file -> (mtime_ns, ukuran) setelah baca/tulis terakhir
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """
+        Mendaftarkan fungsi callback(nama_file) yang dipanggil setelah file dimuat ulang.
+        """
+        self._listeners.append(callback)
+
+    def load_all(self):
+        """
+        Memuat semua file konfigurasi saat startup; file yang rusak atau hilang menjadi kosong.
+        """
+        for name, (parser, apply, _) in CONFIG_FILES.items():
+            try:
+                parsed, signature = _read_config_file(name)
+            except FileNotFoundError as e:
+                if name != 'discord_routes.json':
+                    logger.error(f"Error loading {name}: {str(e)}")
+                parsed, signature = parser({}), None
+            except (json.JSONDecodeError, ValueError, TypeError, AttributeError) as e:
+                logger.error(f"Error loading {name}: {str(e)}")
+                parsed, signature = parser({}), _file_signature(name)
+            apply(parsed)
+            self._signatures[name] = signature
+        self.version += 1
+
+    def save(self, name):
+        """
+        Menandai file konfigurasi untuk ditulis ke disk setelah jeda debounce.
+
+        Args:
+            name (str): Nama file (misalnya 'channels.json').
+        """
+        self.version += 1
+        self._dirty.add(name)
+        if self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.debounce, self._spawn_flush)
+
+    def _spawn_flush(self):
+        task = asyncio.ensure_future(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self):
+        """
+        Menulis semua file yang berubah ke disk secara atomik di thread terpisah.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        while self._flushing is not None:
+            await self._flushing
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, set()
+        # Isi file diambil di event loop agar konsisten dengan state di memori
+        snapshots = {name: CONFIG_FILES[name][2]() for name in dirty}
+        self._flushing = asyncio.get_running_loop().create_future()
+        try:
+            for name, data in snapshots.items():
+                try:
+                    self._signatures[name] = await asyncio.to_thread(_write_config_file, name, data)
+                    logger.info(f"Konfigurasi {name} disimpan (versi {self.version})")
+                except Exception as e:
+                    self._dirty.add(name)
+                    logger.error(f"Gagal menyimpan {name}: {str(e)}")
+        finally:
+            self._flushing.set_result(None)
+            self._flushing = None
+
+    async def reload(self, name):
+        """
+        Memuat ulang satu file yang diubah dari luar; state lama dipertahankan jika file rusak.
+
+        Args:
+            name (str): Nama file konfigurasi.
+        """
+        try:
+            parsed, signature = await asyncio.to_thread(_read_config_file, name)
+        except FileNotFoundError:
+            self._signatures[name] = None
+            return
+        except Exception as e:
+            self._signatures[name] = _file_signature(name)
+            logger.error(f"Gagal memuat ulang {name}, konfigurasi lama dipertahankan: {str(e)}")
+            return
+        if name in self._dirty:
+            # Perubahan admin yang belum tersimpan lebih baru dari isi file
+            return
+        CONFIG_FILES[name][1](parsed)
+        self._signatures[name] = signature
+        self.version += 1
+        self.reloads += 1
+        logger.info(f"Konfigurasi {name} dimuat ulang dari disk (versi {self.version})")
+        for callback in self._listeners:
+            try:
+                callback(name)
+            except Exception as e:
+                logger.error(f"Pendengar reload konfigurasi gagal untuk {name}: {str(e)}")
+
+    def start(self):
+        """
+        Menjalankan pemantauan file konfigurasi di latar belakang (aman dipanggil lebih dari sekali).
+        """
+        if self._watch_task is None:
+            self._watch_task = asyncio.create_task(self.watch())
+
+    async def watch(self):
+        """
+        Loop pemantauan file konfigurasi untuk hot reload.
+        """
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            if self._flushing is not None:
+                continue
+            for name in CONFIG_FILES:
+                if name in self._dirty:
+                    continue
+                if _file_signature(name) != self._signatures.get(name):
+                    await self.reload(name)
+
+    def close(self):
+        """
+        Menghentikan pemantauan dan flush yang dijadwalkan, lalu menulis perubahan yang
+        tertunda secara sinkron saat bot berhenti.
+        """
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            self._watch_task = None
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for name in list(self._dirty):
+            try:
+                self._signatures[name] = _write_config_file(name, CONFIG_FILES[name][2]())
+                self._dirty.discard(name)
+            except Exception as e:
+                logger.error(f"Gagal menyimpan {name}: {str(e)}")
+
 def load_config():
-    """Memuat konfigurasi dari channels.json, keywords.json, dan summary_keywords.json."""
-    global FILTERED_CHANNELS, UNFILTERED_CHANNELS, VIP_CHANNELS, SUMMARY_CHANNELS, IMAGE_CHANNELS, KEYWORDS, SUMMARY_KEYWORDS
-    try:
-        with open('channels.json', 'r') as f:
-            channels_data = json.load(f)
-            FILTERED_CHANNELS = [int(ch) if int(ch) < 0 else -1000000000000 - int(ch) for ch in channels_data.get('FILTERED_CHANNELS', [])]
-            UNFILTERED_CHANNELS = [int(ch) if int(ch) < 0 else -1000000000000 - int(ch) for ch in channels_data.get('UNFILTERED_CHANNELS', [])]
-            VIP_CHANNELS = [int(ch) if int(ch) < 0 else -1000000000000 - int(ch) for ch in channels_data.get('VIP_CHANNELS', [])]
-            SUMMARY_CHANNELS = [int(ch) if int(ch) < 0 else -1000000000000 - int(ch) for ch in channels_data.get('SUMMARY_CHANNELS', [])]
-            IMAGE_CHANNELS = [int(ch) if int(ch) < 0 else -1000000000000 - int(ch) for ch in channels_data.get('IMAGE_CHANNELS', [])]
-            
-            logger.info(f"Loaded channels: FILTERED={FILTERED_CHANNELS}, UNFILTERED={UNFILTERED_CHANNELS}, VIP={VIP_CHANNELS}, SUMMARY={SUMMARY_CHANNELS}, IMAGE={IMAGE_CHANNELS}")
-    except (FileNotFoundError, json.JSONDecodeError, ValueError) as e:
-        logger.error(f"Error loading channels.json: {str(e)}")
-        FILTERED_CHANNELS = []
-        UNFILTERED_CHANNELS = []
-        VIP_CHANNELS = []
-        SUMMARY_CHANNELS = []
-        IMAGE_CHANNELS = []
-
-    try:
-        with open('keywords.json', 'r') as f:
-            keywords_data = json.load(f)
-            KEYWORDS = [str(kw).strip() for kw in keywords_data.get('KEYWORDS', [])]
-            logger.info(f"Loaded keywords: {KEYWORDS}")
-    except (FileNotFoundError, json.JSONDecodeError, ValueError) as e:
-        logger.error(f"Error loading keywords.json: {str(e)}")
-        KEYWORDS = []
-
-    try:
-        with open('summary_keywords.json', 'r') as f:
-            summary_keywords_data = json.load(f)
-            SUMMARY_KEYWORDS = [str(kw).strip() for kw in summary_keywords_data.get('SUMMARY_KEYWORDS', [])]
-            logger.info(f"Loaded summary keywords: {SUMMARY_KEYWORDS}")
-    except (FileNotFoundError, json.JSONDecodeError, ValueError) as e:
-        logger.error(f"Error loading summary_keywords.json: {str(e)}")
-        SUMMARY_KEYWORDS = []
+    """Memuat konfigurasi dari channels.json, keywords.json, summary_keywords.json, dan discord_routes.json."""
+    config_store.load_all()
 
 # Inisialisasi saat modul diimpor
 logger = setup_logging()
 load_env()
+config_store = ConfigStore()
 load_config()
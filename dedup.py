@@ -0,0 +1,145 @@
+# dedup.py
+import asyncio
+import json
+import time
+from config import DEDUP_MAX_SIZE, DEDUP_TTL, DEDUP_PATH, logger, write_json_atomic
+
+def message_key(chat_id, message_id):
+    """
+    Menggabungkan chat_id dan message_id menjadi satu kunci integer.
+
+    ID pesan Telegram selalu di bawah 2**32, sehingga kunci unik per pasangan.
+
+    Args:
+        chat_id (int): ID chat sumber.
+        message_id (int): ID pesan di chat tersebut.
+
+    Returns:
+        int: Kunci deduplikasi.
+    """
+    return (chat_id << 32) | (message_id & 0xFFFFFFFF)
+
+class DedupStore:
+    """
+    Penyimpanan deduplikasi pesan dengan lookup O(1) dan jendela ukuran/waktu.
+
+    Kunci disimpan di dict yang berurutan sesuai waktu masuk, sehingga entri tertua
+    selalu berada di depan dan dapat dibuang tanpa pemindaian. Isi penyimpanan
+    di-snapshot ke disk secara berkala agar restart tidak meneruskan ulang pesan terbaru.
+    """
+
+    def __init__(self, max_size=DEDUP_MAX_SIZE, ttl=DEDUP_TTL, path=DEDUP_PATH, snapshot_interval=30):
+        """
+        Args:
+            max_size (int): Jumlah maksimum kunci yang diingat.
+            ttl (int): Umur maksimum kunci dalam detik (0 = tanpa batas waktu).
+            path (str): Lokasi file snapshot JSON.
+            snapshot_interval (float): Jeda antar snapshot dalam detik.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.snapshot_interval = snapshot_interval
+        self._seen = {}  # kunci -> waktu pertama terlihat
+        self._dirty = False
+        self.duplicates = 0
+        self._load()
+
+    def __len__(self):
+        return len(self._seen)
+
+    def __contains__(self, key):
+        return key in self._seen
+
+    def _evict(self, now):
+        seen = self._seen
+        while len(seen) > self.max_size:
+            del seen[next(iter(seen))]
+        if self.ttl:
+            cutoff = now - self.ttl
+            while seen:
+                oldest = next(iter(seen))
+                if seen[oldest] >= cutoff:
+                    break
+                del seen[oldest]
+
+    def check_and_add(self, chat_id, message_id):
+        """
+        Mencatat pesan dan memeriksa apakah pesan sudah pernah diproses.
+
+        Args:
+            chat_id (int): ID chat sumber.
+            message_id (int): ID pesan.
+
+        Returns:
+            bool: True jika pesan baru, False jika duplikat.
+        """
+        key = message_key(chat_id, message_id)
+        if key in self._seen:
+            self.duplicates += 1
+            return False
+        now = time.time()
+        self._seen[key] = now
+        self._dirty = True
+        self._evict(now)
+        return True
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.error(f"Gagal memuat snapshot deduplikasi {self.path}: {str(e)}")
+            return
+        for key, seen_at in entries:
+            self._seen[int(key)] = float(seen_at)
+        self._evict(time.time())
+        logger.info(f"{len(self._seen)} kunci deduplikasi dimuat dari {self.path}")
+
+    def _write(self, entries):
+        write_json_atomic(self.path, entries)
+
+    async def snapshot(self):
+        """
+        Menyimpan isi penyimpanan ke disk (penulisan atomik lewat file sementara).
+        """
+        if not self._dirty:
+            return
+        self._dirty = False
+        entries = list(self._seen.items())
+        try:
+            await asyncio.to_thread(self._write, entries)
+        except Exception as e:
+            self._dirty = True
+            logger.error(f"Gagal menyimpan snapshot deduplikasi: {str(e)}")
+
+    async def run(self):
+        """
+        Loop snapshot berkala.
+        """
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            await self.snapshot()
+
+    def close(self):
+        """
+        Menyimpan snapshot terakhir secara sinkron saat bot berhenti.
+        """
+        if not self._dirty:
+            return
+        try:
+            self._write(list(self._seen.items()))
+            self._dirty = False
+        except Exception as e:
+            logger.error(f"Gagal menyimpan snapshot deduplikasi: {str(e)}")
+
+    def stats(self):
+        return {
+            'size': len(self._seen),
+            'max_size': self.max_size,
+            'duplicates': self.duplicates,
+        }
+
+dedup_store = DedupStore()
@@ -0,0 +1,154 @@
+# discord_ratelimit.py
+import asyncio
+import time
+from config import DISCORD_MIN_SEND_INTERVAL, logger
+
+class RateLimitBucket:
+    """
+    Status satu bucket rate limit Discord berdasarkan header respons terakhir.
+    """
+
+    def __init__(self):
+        self.limit = None
+        self.remaining = None  # None berarti belum diketahui (belum ada respons)
+        self.reset_at = 0.0
+        self.lock = asyncio.Lock()
+
+class DiscordRateLimiter:
+    """
+    Pembatas laju berbasis token bucket yang mengikuti header rate limit Discord.
+
+    Setiap route dipetakan ke bucket yang dilaporkan Discord melalui header
+    X-RateLimit-Bucket. Discord memakai hash yang sama untuk semua channel/webhook pada
+    satu jenis route, sedangkan batas sebenarnya berlaku per hash dan parameter utama
+    (ID channel atau ID webhook), sehingga bucket dikunci dengan pasangan keduanya. Sisa kuota (X-RateLimit-Remaining) dan waktu reset
+    (X-RateLimit-Reset-After) menentukan kapan pengiriman berikutnya boleh dilakukan.
+    Respons 429 global menghentikan semua route sampai Retry-After habis.
+    """
+
+    def __init__(self, min_interval=DISCORD_MIN_SEND_INTERVAL):
+        self.min_interval = min_interval
+        self._route_buckets = {}  # route -> hash bucket dari Discord
+        self._buckets = {}  # (hash bucket, parameter utama) (atau route sebelum diketahui) -> RateLimitBucket
+        self._global_reset_at = 0.0
+        self._last_send = 0.0
+        self.waited_seconds = 0.0
+        self.rate_limited = 0
+
+    @staticmethod
+    def major_parameter(route):
+        """
+        Mengambil parameter utama (ID channel atau ID webhook) dari route.
+
+        Args:
+            route (str): Identitas route, misalnya "POST /channels/{id}/messages".
+
+        Returns:
+            str: ID channel/webhook, atau route itu sendiri jika tidak dikenali.
+        """
+        parts = route.split(" ", 1)[-1].strip("/").split("/")
+        if len(parts) >= 2 and parts[0] in ("channels", "webhooks", "guilds"):
+            return f"{parts[0]}/{parts[1]}"
+        return route
+
+    def _bucket_for(self, route):
+        key = self._route_buckets.get(route, route)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = RateLimitBucket()
+        return bucket
+
+    async def _sleep(self, delay, reason):
+        if delay <= 0:
+            return
+        logger.info(f"Menunggu {delay:.2f} detik ({reason}) sebelum mengirim ke Discord...")
+        self.waited_seconds += delay
+        await asyncio.sleep(delay)
+
+    async def acquire(self, route):
+        """
+        Menunggu sampai route boleh mengirim permintaan berikutnya, lalu memakai satu token.
+
+        Args:
+            route (str): Identitas route, misalnya "POST /channels/{id}/messages".
+        """
+        bucket = self._bucket_for(route)
+        async with bucket.lock:
+            while True:
+                now = time.monotonic()
+                if self._global_reset_at > now:
+                    await self._sleep(self._global_reset_at - now, "rate limit global")
+                    continue
+                if bucket.remaining is not None and bucket.remaining <= 0 and bucket.reset_at > now:
+                    await self._sleep(bucket.reset_at - now, f"bucket {route} habis")
+                    continue
+                if bucket.remaining is not None and bucket.reset_at <= now and bucket.limit is not None:
+                    bucket.remaining = bucket.limit
+                if self.min_interval and self._last_send + self.min_interval > now:
+                    await self._sleep(self._last_send + self.min_interval - now, "jeda minimum")
+                    continue
+                break
+
+            if bucket.remaining is not None:
+                bucket.remaining -= 1
+            self._last_send = time.monotonic()
+
+    def update(self, route, status, headers, retry_after=None):
+        """
+        Memperbarui status bucket dari header respons Discord.
+
+        Args:
+            route (str): Route yang baru saja dipanggil.
+            status (int): Kode status HTTP.
+            headers (Mapping): Header respons.
+            retry_after (float, optional): Nilai retry_after dari body respons 429.
+        """
+        now = time.monotonic()
+        bucket_hash = headers.get("X-RateLimit-Bucket")
+        if bucket_hash:
+            key = (bucket_hash, self.major_parameter(route))
+            if self._route_buckets.get(route) != key:
+                # Bucket sementara milik route sendiri dipindahkan; bucket bersama tidak disentuh
+                provisional = self._buckets.pop(route, None)
+                self._route_buckets[route] = key
+                if key not in self._buckets:
+                    self._buckets[key] = provisional or RateLimitBucket()
+        bucket = self._bucket_for(route)
+
+        try:
+            if "X-RateLimit-Limit" in headers:
+                bucket.limit = int(headers["X-RateLimit-Limit"])
+            if "X-RateLimit-Remaining" in headers:
+                bucket.remaining = int(headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Reset-After" in headers:
+                bucket.reset_at = now + float(headers["X-RateLimit-Reset-After"])
+        except ValueError as e:
+            logger.warning(f"Header rate limit Discord tidak valid: {str(e)}")
+
+        if status == 429:
+            self.rate_limited += 1
+            if retry_after is None:
+                try:
+                    retry_after = float(headers.get("Retry-After", 5))
+                except ValueError:
+                    retry_after = 5.0
+            is_global = headers.get("X-RateLimit-Global", "").lower() == "true" or headers.get("X-RateLimit-Scope") == "global"
+            if is_global:
+                self._global_reset_at = now + retry_after
+                logger.warning(f"Rate limit global Discord tercapai. Semua pengiriman ditunda {retry_after:.2f} detik.")
+            else:
+                bucket.remaining = 0
+                bucket.reset_at = max(bucket.reset_at, now + retry_after)
+                logger.warning(f"Rate limit route {route} tercapai. Menunggu {retry_after:.2f} detik.")
+
+    def stats(self):
+        """
+        Mengembalikan statistik pembatas laju.
+
+        Returns:
+            dict: Jumlah respons 429 dan total waktu tunggu.
+        """
+        return {
+            'rate_limited': self.rate_limited,
+            'waited_seconds': self.waited_seconds,
+        }
@@ -2,170 +2,633 @@
 import aiohttp
 import asyncio
 import time
-import random
 import os
 import json
-from config import DISCORD_AUTH_TOKEN, DISCORD_THREAD_ID, logger
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from config import (
+    DISCORD_AUTH_TOKEN, DISCORD_THREAD_ID, DISCORD_BATCH_LINGER, DISCORD_ROUTES,
+    DISCORD_QUEUE_CAPACITY, DISCORD_TIER_CAPACITY, DISCORD_OVERFLOW_POLICY, DISCORD_BACKPRESSURE_RATIO, logger,
+    redact_discord_target
+)
 from utils import guess_blocked_keywords
+from http_client import get_session
+from discord_ratelimit import DiscordRateLimiter
+from retry_scheduler import RetryScheduler
+from outbox import outbox
+from media_buffer import media_buffer
+from image_processing import detect_format
+from media_cache import media_cache
+from priority_queue import TieredQueue, DEFAULT_TIER, tier_for_category
+
+@dataclass
+class DiscordMessage:
+    """
+    Item antrian Discord beserta status retry-nya.
+    """
+    content: str
+    media_path: str = None
+    attempts: int = 0
+    destination: "DiscordDestination" = None
+    outbox_ids: list = field(default_factory=list)
+    tier: int = DEFAULT_TIER
+    attachments: list = field(default_factory=list)  # bytes di memori atau path file yang di-spill
+    attachment_keys: list = field(default_factory=list)  # hash isi per lampiran untuk cache media
+    media_urls: list = field(default_factory=list)  # URL lampiran Discord yang dipakai ulang
+
+    @property
+    def has_media(self):
+        return bool(self.attachments) or bool(self.media_path) or bool(self.media_urls)
+
+# Batas panjang konten satu pesan Discord
+DISCORD_MESSAGE_LIMIT = 2000
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36"
 
-message_queue = asyncio.Queue()
 failed_message_queue = asyncio.Queue()
+rate_limiter = DiscordRateLimiter()
+
+async def _requeue(item):
+    await item.destination.queue.put(item)
+
+retry_scheduler = RetryScheduler(_requeue)
+
+class DiscordDestination:
+    """
+    Satu tujuan Discord (thread/channel atau webhook) dengan antrian dan pekerja sendiri.
+
+    Setiap tujuan dikirim secara paralel, sehingga tujuan yang terkena rate limit atau
+    rusak tidak menahan pengiriman ke tujuan lain.
+    """
+
+    def __init__(self, target):
+        """
+        Args:
+            target (str): ID thread/channel Discord atau URL webhook.
+        """
+        self.target = target
+        self.is_webhook = target.startswith("https://")
+        self.queue = TieredQueue(
+            capacity=DISCORD_QUEUE_CAPACITY,
+            tier_capacity=DISCORD_TIER_CAPACITY,
+            policy=DISCORD_OVERFLOW_POLICY,
+            on_shed=self._on_shed,
+        )
+        self.spilled = deque()  # (outbox_ids, item jika tidak tercatat di outbox)
+        self.spilled_in_memory = 0
+        self.spilling = 0  # Pesan bermedia yang sedang ditulis ke disk
+        self.dropped = 0
+        self.disabled = False  # True selama akses ke tujuan gagal divalidasi
+        self.worker = None
+        self._tasks = set()
+        self.sent = 0
+        if self.is_webhook:
+            separator = "&" if "?" in target else "?"
+            self.url = f"{target}{separator}wait=true"
+            self.validate_url = target.split("?", 1)[0]
+            self.headers = {"User-Agent": USER_AGENT}
+            # Rate limit webhook berlaku per webhook; token tidak dimasukkan ke route karena route ditulis ke log
+            self.name = redact_discord_target(target)
+            self.route = f"POST /webhooks/{self.name.split(' ', 1)[1]}"
+        else:
+            self.url = f"https://discord.com/api/v10/channels/{target}/messages"
+            self.validate_url = f"https://discord.com/api/v10/channels/{target}"
+            self.headers = {"Authorization": DISCORD_AUTH_TOKEN, "User-Agent": USER_AGENT}
+            self.route = f"POST /channels/{target}/messages"
+            self.name = f"thread {target}"
+
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _on_shed(self, item, spilled):
+        if spilled and item.outbox_ids and None not in item.outbox_ids:
+            if any(isinstance(attachment, bytes) for attachment in item.attachments):
+                # Lampiran di memori ditulis ke disk dulu agar pesan bisa dilepas dari memori
+                self.spilling += 1
+                self._spawn(self._spill_media(item))
+                return
+            # Pesan (dan lampiran di disk) tetap tersimpan di outbox; hanya ID-nya yang disimpan di memori
+            self.spilled.append((item.outbox_ids, None))
+            logger.warning(f"{self._spill_reason()}, pesan di-spill ke disk: {item.content[:50]}...")
+            return
+        if spilled and self.spilled_in_memory < (self.queue.capacity or 0):
+            # Pesan tanpa baris outbox hanya bisa ditahan di memori, dengan batas jumlah
+            self.spilled.append((None, item))
+            self.spilled_in_memory += 1
+            return
+        self.dropped += 1
+        logger.warning(f"{self._spill_reason()}, pesan dibuang: {item.content[:50]}...")
+        if self.disabled:
+            failed_message_queue.put_nowait((item.content, f"Tujuan Discord {self.name} tidak dapat diakses dan antrian penuh"))
+        _release_media(item)
+        self._spawn(outbox.ack(item.outbox_ids))
+
+    def _spill_reason(self):
+        return f"Tujuan {self.name} nonaktif" if self.disabled else f"Antrian {self.name} penuh"
+
+    async def _spill_media(self, item):
+        try:
+            attachments = []
+            for attachment in item.attachments:
+                if isinstance(attachment, bytes):
+                    attachment = await media_buffer.spill(attachment, f".{detect_format(attachment)[0]}")
+                attachments.append(attachment)
+            item.attachments = attachments
+            await outbox.set_attachments(item.outbox_ids[0], {
+                'paths': attachments,
+                'keys': item.attachment_keys or [None] * len(attachments),
+                'urls': item.media_urls,
+            })
+            self.spilled.append((item.outbox_ids, None))
+            logger.warning(f"{self._spill_reason()}, pesan bermedia di-spill ke disk: {item.content[:50]}...")
+        except Exception as e:
+            self.dropped += 1
+            logger.error(f"Gagal men-spill pesan bermedia ke disk, pesan dibuang: {str(e)}")
+            _release_media(item)
+            await outbox.ack(item.outbox_ids)
+        finally:
+            self.spilling -= 1
+
+    async def _refill(self):
+        """
+        Memasukkan kembali pesan yang di-spill saat antrian sudah longgar.
+        """
+        room = self.queue.capacity // 2 - self.queue.qsize() if self.queue.capacity else len(self.spilled)
+        while self.spilled and room > 0:
+            outbox_ids, item = self.spilled.popleft()
+            messages = [item] if item is not None else [_message_from_row(self, row) for row in await outbox.load(outbox_ids)]
+            # Berhenti sebelum melampaui kapasitas tingkat; jika tidak, pesan yang baru dimasukkan
+            # akan langsung di-spill lagi dan urutannya terbalik
+            if self.queue.tier_capacity is not None and any(
+                self.queue.tier_size(tier) + count > self.queue.tier_capacity
+                for tier, count in Counter(message.tier for message in messages).items()
+            ):
+                self.spilled.appendleft((outbox_ids, item))
+                break
+            if item is not None:
+                self.spilled_in_memory -= 1
+            for message in messages:
+                self.queue.put_nowait(message)
+                room -= 1
+
+    def is_saturated(self):
+        """
+        Mengembalikan True jika antrian tujuan ini hampir penuh atau masih memiliki pesan yang di-spill.
+        Tujuan yang dinonaktifkan tidak dianggap jenuh karena pesannya langsung disimpan di outbox.
+        """
+        if self.disabled:
+            return False
+        return bool(self.spilled) or bool(self.spilling) or self.queue.fill_ratio() >= DISCORD_BACKPRESSURE_RATIO
+
+    async def _hold_pending(self, duration):
+        """
+        Selama tujuan dinonaktifkan, memindahkan pesan yang masuk antrian ke daftar spill
+        selama `duration` detik. Baris outbox tidak dihapus, sehingga pesan dikirim ulang
+        setelah akses pulih.
+        """
+        deadline = time.monotonic() + duration
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                return
+            try:
+                self._on_shed(item, True)
+            finally:
+                self.queue.task_done()
+
+    async def validate_access(self, session):
+        """
+        Memeriksa apakah bot memiliki akses ke tujuan Discord ini.
+        
+        Returns:
+            bool: True jika akses valid, False jika akses pasti ditolak (401/403/404: token
+                salah, tanpa izin, atau channel/webhook tidak dikenal), None jika galat
+                sementara (timeout, 5xx, 429, galat jaringan).
+        """
+        try:
+            async with session.get(self.validate_url, headers=self.headers, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                if response.status == 200:
+                    logger.info(f"Tujuan Discord {self.name} dapat diakses.")
+                    return True
+                logger.error(f"Gagal mengakses tujuan Discord {self.name}: {response.status} - {await response.text()}")
+                if response.status in (401, 403, 404):
+                    return False
+                return None
+        except Exception as e:
+            logger.error(f"Error saat memvalidasi tujuan Discord {self.name}: {str(e)}")
+            return None
+
+    async def coalesce_messages(self, first, linger=DISCORD_BATCH_LINGER):
+        """
+        Menggabungkan beberapa pesan teks dari antrian menjadi satu pesan Discord.
+        
+        Pesan yang sudah mengantre langsung digabung; selain itu pekerja menunggu paling lama
+        `linger` detik untuk pesan berikutnya. Penggabungan berhenti saat batas 2000 karakter
+        akan terlampaui atau saat bertemu pesan bermedia atau pesan retry. Hanya pesan yang
+        belum pernah dicoba yang digabung, sehingga pesan baru tidak mewarisi jumlah
+        percobaan pesan lain.
+        
+        Args:
+            first (DiscordMessage): Pesan teks pertama yang sudah diambil dari antrian.
+            linger (float): Waktu tunggu maksimum untuk pesan tambahan dalam detik.
+        
+        Returns:
+            tuple: (pesan gabungan, jumlah item antrian yang digabung, item sisa yang belum diproses atau None).
+        """
+        parts = [first.content]
+        outbox_ids = list(first.outbox_ids)
+        length = len(first.content)
+        tier = first.tier
+        deadline = time.monotonic() + linger
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            if item.has_media or item.attempts or length + 1 + len(item.content) > DISCORD_MESSAGE_LIMIT:
+                return self._merge(first, parts, outbox_ids, tier), len(parts), item
+
+            parts.append(item.content)
+            outbox_ids.extend(item.outbox_ids)
+            length += 1 + len(item.content)
+            tier = min(tier, item.tier)
+
+        return self._merge(first, parts, outbox_ids, tier), len(parts), None
+
+    def _merge(self, first, parts, outbox_ids, tier):
+        if len(parts) == 1:
+            return first
+        logger.info(f"{len(parts)} pesan digabung menjadi satu pesan Discord untuk {self.name} ({sum(len(p) for p in parts) + len(parts) - 1} karakter).")
+        return DiscordMessage("\n".join(parts), destination=self, outbox_ids=outbox_ids, tier=tier)
+
+    def _remember_attachment_urls(self, sources, response_text):
+        try:
+            attachments = json.loads(response_text).get("attachments", [])
+        except (ValueError, AttributeError):
+            return
+        for (_, key), attachment in zip(sources, attachments):
+            if key and attachment.get("url"):
+                media_cache.remember_url(key, self.target, attachment["url"])
+
+    async def run(self):
+        """
+        Pekerja yang mengambil pesan dari antrian tujuan ini dan mengirimkannya ke Discord.
+        """
+        session = get_session()
+        # Validasi akses tujuan saat startup. Galat sementara hanya ditunggu dengan backoff
+        # (antrian tetap utuh); akses yang pasti ditolak menonaktifkan tujuan, dan pesannya
+        # disimpan di outbox sampai akses pulih
+        retry_delay = 5
+        disabled_delay = 30
+        while True:
+            access = await self.validate_access(session)
+            if access:
+                break
+            if access is None:
+                logger.warning(f"Validasi {self.name} gagal sementara, dicoba lagi dalam {retry_delay} detik.")
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 300)
+                continue
+            if not self.disabled:
+                self.disabled = True
+                logger.critical(f"Bot tidak memiliki akses ke {self.name}. Periksa izin bot, thread ID, atau URL webhook.")
+                await failed_message_queue.put(("", f"Bot tidak memiliki akses ke {self.name}. Pesan untuk tujuan ini disimpan di outbox dan dikirim setelah akses pulih."))
+            await self._hold_pending(disabled_delay)
+            disabled_delay = min(disabled_delay * 2, 1800)
+        if self.disabled:
+            self.disabled = False
+            logger.info(f"Akses ke {self.name} pulih, {len(self.spilled)} pesan tertunda dikirim ulang.")
+            await self._refill()
+
+        carry = None  # Item yang sudah diambil saat penggabungan tetapi belum dikirim
+        while True:
+            if carry is not None:
+                item, carry = carry, None
+            else:
+                item = await self.queue.get()
+            consumed = 1
+            if not item.has_media and not item.attempts:
+                item, consumed, carry = await self.coalesce_messages(item)
+            message, media_path = item.content, item.media_path
+            media_label = f"{len(item.attachments)} lampiran" if item.attachments else media_path
+            logger.info(f"Mengambil pesan dari antrian {self.name}: {message[:50]}... (media: {media_label})")
+
+            content = message
+            if item.media_urls:
+                # Gambar yang sudah pernah diunggah ke tujuan ini cukup dikirim sebagai tautan
+                links = "\n".join(item.media_urls)
+                content = f"{message[:max(0, DISCORD_MESSAGE_LIMIT - len(links) - 1)]}\n{links}"
+            payload = {
+                "content": content[:DISCORD_MESSAGE_LIMIT],  # Batasi 2000 karakter sesuai Discord
+                "tts": False,
+                "flags": 0
+            }
+            if not self.is_webhook:
+                payload["nonce"] = str(int(time.time() * 1000))
+
+            # Tunggu sampai bucket rate limit Discord mengizinkan pengiriman
+            await rate_limiter.acquire(self.route)
+
+            # Pesan yang masih akan dikirim ulang tidak boleh kehilangan file medianya
+            pending_retry = False
+            media_files = []
+            try:
+                sources = list(zip(item.attachments, item.attachment_keys or [None] * len(item.attachments)))
+                if media_path and os.path.exists(media_path):
+                    sources.append((media_path, None))
+                sources = [(source, key) for source, key in sources if isinstance(source, bytes) or os.path.exists(source)]
+                if sources:
+                    # Kirim pesan dengan lampiran langsung dari memori, atau dari file jika media di-spill ke disk
+                    form = aiohttp.FormData()
+                    form.add_field("payload_json", json.dumps(payload))
+                    for index, (source, _) in enumerate(sources):
+                        if isinstance(source, bytes):
+                            extension, content_type = detect_format(source)
+                            form.add_field(f"files[{index}]", source, filename=f"image{index}.{extension}", content_type=content_type)
+                        else:
+                            media_file = open(source, "rb")
+                            media_files.append(media_file)
+                            extension, content_type = detect_format(media_file.read(12))
+                            media_file.seek(0)
+                            form.add_field(f"files[{index}]", media_file, filename=f"image{index}.{extension}", content_type=content_type)
+                    request = session.post(self.url, headers=self.headers, data=form, timeout=aiohttp.ClientTimeout(total=60))
+                else:
+                    # Kirim pesan tanpa lampiran
+                    media_path = item.media_path = None
+                    request = session.post(self.url, headers=self.headers, json=payload, timeout=aiohttp.ClientTimeout(total=30))
+
+                async with request as response:
+                    response_text = await response.text()
+                    logger.info(f"Discord response ({self.name}): {response.status} - {response_text}")
+                    retry_after = None
+                    if response.status == 429:
+                        try:
+                            retry_after = float(json.loads(response_text).get("retry_after"))
+                        except (ValueError, TypeError, AttributeError):
+                            retry_after = None
+                    rate_limiter.update(self.route, response.status, response.headers, retry_after)
+
+                    if response.status in (200, 204):
+                        self.sent += 1
+                        await outbox.ack(item.outbox_ids)
+                        if sources:
+                            self._remember_attachment_urls(sources, response_text)
+                        logger.info(f"Pesan{' dengan lampiran' if item.has_media else ''} berhasil dikirim ke {self.name}")
+                    elif response.status == 401:
+                        reason = f"Unauthorized: Bot tidak diizinkan mengakses {self.name}"
+                        logger.error(f"{reason}: {response_text}")
+                        pending_retry = await handle_failed_message(item, reason=reason)
+                    elif response.status == 429:
+                        # Pembatas laju akan menunggu sampai bucket pulih sebelum pengiriman berikutnya
+                        await self.queue.put(item)  # Tambahkan kembali ke antrian
+                        pending_retry = True
+                    elif response.status == 400 and "blocked" in response_text.lower():
+                        logger.warning(f"Pesan diblokir oleh server Discord: {message[:50]}...")
+                        pending_retry = await handle_failed_message(item, reason="Pesan diblokir oleh server")
+                    else:
+                        reason = f"Error API: {response.status} - {response_text}"
+                        logger.critical(f"Gagal mengirim pesan ke {self.name}: {reason}")
+                        pending_retry = await handle_failed_message(item, reason=reason)
+            except Exception as e:
+                logger.critical(f"Exception saat mengirim pesan ke {self.name}: {str(e)}")
+                pending_retry = await handle_failed_message(item, reason=f"Exception: {str(e)}")
+            finally:
+                for media_file in media_files:
+                    media_file.close()
+                if not pending_retry:
+                    _release_media(item)
+                for _ in range(consumed):
+                    self.queue.task_done()
+                if self.spilled:
+                    await self._refill()
+
+def _message_from_row(destination, row):
+    """
+    Membangun DiscordMessage dari baris outbox, termasuk lampiran yang tersimpan di disk.
+    """
+    row_id, _, content, media_path, attempts, tier, stored = row
+    if media_path and not os.path.exists(media_path):
+        logger.warning(f"File media {media_path} untuk pesan outbox {row_id} tidak ditemukan, dikirim tanpa lampiran.")
+        media_path = None
+    paths = stored.get('paths', [])
+    keys = stored.get('keys') or [None] * len(paths)
+    attachments = []
+    attachment_keys = []
+    for path, key in zip(paths, keys):
+        if os.path.exists(path):
+            attachments.append(path)
+            attachment_keys.append(key)
+        else:
+            logger.warning(f"Lampiran {path} untuk pesan outbox {row_id} tidak ditemukan, dikirim tanpa lampiran itu.")
+    return DiscordMessage(
+        content, media_path, attempts, destination, outbox_ids=[row_id], tier=tier,
+        attachments=attachments, attachment_keys=attachment_keys, media_urls=list(stored.get('urls', []))
+    )
+
+def _release_media(item):
+    """
+    Melepas media pesan: mengembalikan anggaran memori atau menghapus file yang di-spill.
+    """
+    for attachment in item.attachments:
+        if isinstance(attachment, bytes):
+            media_buffer.release(attachment)
+        else:
+            _remove_media(attachment)
+    item.attachments = []
+    _remove_media(item.media_path)
 
-async def send_message_to_discord_thread(message, media_path=None):
+def _remove_media(media_path):
     """
-    Menambahkan pesan ke antrian untuk dikirim ke thread Discord.
+    Menghapus file media sementara jika masih ada.
+    """
+    if media_path and os.path.exists(media_path):
+        try:
+            os.remove(media_path)
+            logger.info(f"File sementara dihapus: {media_path}")
+        except Exception as e:
+            logger.error(f"Gagal menghapus file sementara {media_path}: {str(e)}")
+
+destinations = {}  # target -> DiscordDestination
+_workers_started = False
+
+def get_destination(target):
+    """
+    Mengembalikan tujuan Discord untuk target tertentu, membuatnya jika belum ada.
+    
+    Jika pekerja Discord sudah berjalan, pekerja untuk tujuan baru langsung dijalankan.
     
     Args:
-        message (str): Pesan yang akan dikirim.
-        media_path (str, optional): Path lokal ke file media (misalnya, gambar) untuk diunggah.
+        target (str): ID thread/channel Discord atau URL webhook.
+    
+    Returns:
+        DiscordDestination: Tujuan Discord.
     """
-    await message_queue.put((message, media_path))
-    logger.info(f"Pesan ditambahkan ke antrian utama: {message[:50]}...")
+    destination = destinations.get(target)
+    if destination is None:
+        destination = destinations[target] = DiscordDestination(target)
+        if _workers_started:
+            destination.worker = asyncio.create_task(destination.run())
+            logger.info(f"Pekerja Discord baru dijalankan untuk {destination.name}")
+    return destination
 
-async def validate_thread_access(session, headers):
+def resolve_target(category=None, chat_id=None):
     """
-    Memeriksa apakah bot memiliki akses ke thread Discord.
+    Menentukan target Discord berdasarkan aturan di discord_routes.json.
+    
+    Urutan prioritas: aturan per chat_id, aturan per kategori, lalu DISCORD_THREAD_ID.
+    
+    Args:
+        category (str, optional): Kategori channel (VIP, SUMMARY, FILTERED, UNFILTERED, IMAGE).
+        chat_id (int, optional): ID chat sumber.
     
     Returns:
-        bool: True jika akses valid, False jika tidak.
-    """
-    url = f"https://discord.com/api/v10/channels/{DISCORD_THREAD_ID}"
-    try:
-        async with session.get(url, headers=headers, timeout=5) as response:
-            if response.status == 200:
-                logger.info(f"Thread Discord {DISCORD_THREAD_ID} dapat diakses.")
-                return True
-            else:
-                logger.error(f"Gagal mengakses thread Discord {DISCORD_THREAD_ID}: {response.status} - {await response.text()}")
-                return False
-    except Exception as e:
-        logger.error(f"Error saat memvalidasi thread Discord {DISCORD_THREAD_ID}: {str(e)}")
-        return False
+        str: ID thread/channel Discord atau URL webhook.
+    """
+    target = DISCORD_ROUTES['chats'].get(chat_id) if chat_id is not None else None
+    if target is None and category:
+        target = DISCORD_ROUTES['categories'].get(category.upper())
+    return target or DISCORD_THREAD_ID
+
+def resolve_destination(category=None, chat_id=None):
+    """
+    Menentukan tujuan Discord berdasarkan aturan di discord_routes.json.
+    
+    Args:
+        category (str, optional): Kategori channel (VIP, SUMMARY, FILTERED, UNFILTERED, IMAGE).
+        chat_id (int, optional): ID chat sumber.
+    
+    Returns:
+        DiscordDestination: Tujuan Discord.
+    """
+    return get_destination(resolve_target(category, chat_id))
+
+def is_egress_saturated(category=None, chat_id=None, target=None):
+    """
+    Memeriksa apakah antrian tujuan Discord untuk kategori/chat tertentu sedang jenuh.
+    
+    Dipakai sebagai sinyal backpressure agar pekerjaan mahal (terjemahan, unduhan media)
+    dapat dilewati saat pesan tidak akan segera terkirim.
+    
+    Args:
+        category (str, optional): Kategori channel sumber.
+        chat_id (int, optional): ID chat sumber.
+        target (str, optional): Target Discord yang sudah ditentukan (melewati resolusi aturan).
+    
+    Returns:
+        bool: True jika tujuan jenuh.
+    """
+    destination = get_destination(target) if target else resolve_destination(category, chat_id)
+    return destination.is_saturated()
+
+async def send_message_to_discord_thread(message, media_path=None, category=None, chat_id=None, target=None, media=None, media_keys=None):
+    """
+    Menambahkan pesan ke antrian tujuan Discord yang sesuai.
+    
+    Args:
+        message (str): Pesan yang akan dikirim.
+        media_path (str, optional): Path lokal ke file media (misalnya, gambar) untuk diunggah.
+        category (str, optional): Kategori channel sumber untuk menentukan tujuan.
+        chat_id (int, optional): ID chat sumber untuk menentukan tujuan.
+        target (str, optional): Target Discord yang sudah ditentukan (melewati resolusi aturan).
+        media (list, optional): Isi media (bytes) di memori, satu per lampiran; media besar atau
+            di luar anggaran ditulis ke disk.
+        media_keys (list, optional): Hash isi per media (dari media_cache) untuk memakai ulang
+            URL lampiran Discord yang sudah pernah diunggah.
+    """
+    destination = get_destination(target) if target else resolve_destination(category, chat_id)
+    attachments = []
+    attachment_keys = []
+    media_urls = []
+    spilled = {'paths': [], 'keys': [], 'urls': media_urls}
+    for data, key in zip(media or [], media_keys or [None] * len(media or [])):
+        url = media_cache.url_for(key, destination.target) if key else None
+        if url:
+            media_urls.append(url)
+            continue
+        data, spilled_path = await media_buffer.admit(data)
+        attachments.append(data if data is not None else spilled_path)
+        attachment_keys.append(key)
+        if spilled_path:
+            spilled['paths'].append(spilled_path)
+            spilled['keys'].append(key)
+    # Catat ke outbox persisten lebih dulu agar pesan tidak hilang jika proses berhenti.
+    # Lampiran yang ada di disk ikut dicatat; lampiran di memori hilang jika proses crash.
+    tier = tier_for_category(category)
+    row_id = await outbox.add(destination.target, message, media_path, tier=tier, attachments=spilled)
+    await destination.queue.put(DiscordMessage(
+        message, media_path, destination=destination, outbox_ids=[row_id], tier=tier,
+        attachments=attachments, attachment_keys=attachment_keys, media_urls=media_urls
+    ))
+    logger.info(f"Pesan{f' dengan {len(attachments) + len(media_urls)} lampiran' if attachments or media_urls else ''} ditambahkan ke antrian {destination.name}: {message[:50]}...")
 
-async def handle_failed_message(message, media_path=None, retry_count=0, max_retries=3, reason="Tidak diketahui"):
+async def handle_failed_message(item, max_retries=3, reason="Tidak diketahui"):
     """
-    Menangani pesan yang gagal dengan delay dan retry.
+    Menangani pesan yang gagal dengan menjadwalkan retry tanpa menahan pekerja.
     
     Args:
-        message (str): Pesan yang gagal.
-        media_path (str, optional): Path file media yang gagal.
-        retry_count (int): Jumlah percobaan saat ini.
+        item (DiscordMessage): Pesan yang gagal.
         max_retries (int): Maksimum percobaan ulang.
         reason (str): Alasan kegagalan.
+    
+    Returns:
+        bool: True jika pesan dijadwalkan untuk retry, False jika gagal permanen.
     """
-    if retry_count >= max_retries:
-        suspected_keywords = guess_blocked_keywords(message)
+    item.attempts += 1
+    if item.attempts > max_retries:
+        suspected_keywords = guess_blocked_keywords(item.content)
         full_reason = f"Gagal permanen: {reason}. Keyword yang mungkin diblokir: {', '.join(suspected_keywords) if suspected_keywords else 'Tidak diketahui'}"
-        logger.critical(f"Pesan gagal setelah {max_retries} percobaan: {message[:50]}... ({full_reason})")
-        await failed_message_queue.put((message, full_reason))
-        return
+        logger.critical(f"Pesan gagal setelah {max_retries} percobaan: {item.content[:50]}... ({full_reason})")
+        await failed_message_queue.put((item.content, full_reason))
+        await outbox.ack(item.outbox_ids)
+        return False
 
-    # Delay acak antara 1-5 menit (60-300 detik)
-    delay = random.uniform(60, 300)
-    logger.info(f"Pesan gagal, menunggu {delay:.2f} detik sebelum retry ke-{retry_count + 1}: {message[:50]}...")
-    await asyncio.sleep(delay)
-    
-    # Tambahkan kembali ke antrian utama
-    await message_queue.put((message, media_path))
-    logger.info(f"Pesan ditambahkan kembali ke antrian utama untuk retry: {message[:50]}...")
+    await outbox.set_attempts(item.outbox_ids, item.attempts)
+    delay = retry_scheduler.backoff(item.attempts)
+    retry_scheduler.schedule(item, delay)
+    logger.info(f"Pesan gagal, dijadwalkan retry ke-{item.attempts} dalam {delay:.2f} detik: {item.content[:50]}...")
+    return True
+
+async def recover_pending_messages():
+    """
+    Memasukkan kembali pesan yang belum terkirim dari outbox persisten ke antrian tujuannya.
+    """
+    rows = await outbox.recover()
+    for row in rows:
+        destination = get_destination(row[1])
+        destination.queue.put_nowait(_message_from_row(destination, row))
+    if rows:
+        logger.info(f"{len(rows)} pesan tertunda dipulihkan dari outbox.")
 
 async def discord_worker():
     """
-    Pekerja yang mengambil pesan dari antrian dan mengirimkannya ke thread Discord.
+    Menjalankan pekerja untuk setiap tujuan Discord secara paralel.
     """
+    global _workers_started
     if not DISCORD_AUTH_TOKEN or not DISCORD_THREAD_ID:
         logger.critical("DISCORD_AUTH_TOKEN atau DISCORD_THREAD_ID tidak valid atau kosong.")
         await failed_message_queue.put(("", "Startup gagal: DISCORD_AUTH_TOKEN atau DISCORD_THREAD_ID kosong."))
         return
 
-    url = f"https://discord.com/api/v10/channels/{DISCORD_THREAD_ID}/messages"
-    headers = {
-        "Authorization": DISCORD_AUTH_TOKEN,
-        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Safari/537.36",
-    }
-
-    async with aiohttp.ClientSession() as session:
-        # Validasi akses thread saat startup
-        if not await validate_thread_access(session, headers):
-            logger.critical("Bot tidak memiliki akses ke thread Discord. Periksa izin bot atau thread ID di .env.")
-            await failed_message_queue.put(("", "Startup gagal: Bot tidak memiliki akses ke thread Discord."))
-            return
-
-        while True:
-            item = await message_queue.get()
-            message, media_path = item
-            logger.info(f"Mengambil pesan dari antrian: {message[:50]}... (media: {media_path})")
-
-            payload = {
-                "content": message[:2000],  # Batasi 2000 karakter sesuai Discord
-                "nonce": str(int(time.time() * 1000)),
-                "tts": False,
-                "flags": 0
-            }
+    # Siapkan tujuan default dan semua tujuan yang dikonfigurasi
+    get_destination(DISCORD_THREAD_ID)
+    for target in list(DISCORD_ROUTES['categories'].values()) + list(DISCORD_ROUTES['chats'].values()):
+        get_destination(target)
 
-            logger.info("Menunggu 10 detik sebelum mengirim pesan ke Discord...")
-            await asyncio.sleep(10)
-            logger.info("Delay selesai, mengirim pesan ke Discord.")
+    await recover_pending_messages()
 
-            try:
-                if media_path and os.path.exists(media_path):
-                    # Kirim pesan dengan lampiran
-                    form = aiohttp.FormData()
-                    form.add_field("payload_json", json.dumps(payload))
-                    form.add_field("file", open(media_path, "rb"), filename=os.path.basename(media_path), content_type="image/jpeg")
-
-                    async with session.post(url, headers=headers, data=form, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                        response_text = await response.text()
-                        logger.info(f"Discord response: {response.status} - {response_text}")
-                        if response.status == 200:
-                            logger.info(f"Pesan dengan lampiran berhasil dikirim ke thread Discord {DISCORD_THREAD_ID}")
-                        elif response.status == 401:
-                            reason = f"Unauthorized: Bot tidak diizinkan mengakses thread {DISCORD_THREAD_ID}"
-                            logger.error(f"{reason}: {response_text}")
-                            await handle_failed_message(message, media_path, retry_count=0, reason=reason)
-                        elif response.status == 429:
-                            retry_after = int(response.headers.get("Retry-After", 5))
-                            logger.warning(f"Rate limit tercapai. Menunggu {retry_after} detik...")
-                            await asyncio.sleep(retry_after)
-                            await message_queue.put((message, media_path))  # Tambahkan kembali ke antrian
-                        elif response.status == 400 and "blocked" in response_text.lower():
-                            logger.warning(f"Pesan diblokir oleh server Discord: {message[:50]}...")
-                            await handle_failed_message(message, media_path, retry_count=0, reason="Pesan diblokir oleh server")
-                        else:
-                            reason = f"Error API: {response.status} - {response_text}"
-                            logger.critical(f"Gagal mengirim pesan ke Discord: {reason}")
-                            await handle_failed_message(message, media_path, retry_count=0, reason=reason)
-                else:
-                    # Kirim pesan tanpa lampiran
-                    async with session.post(url, headers=headers, json=payload, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                        response_text = await response.text()
-                        logger.info(f"Discord response: {response.status} - {response_text}")
-                        if response.status == 200:
-                            logger.info(f"Pesan berhasil dikirim ke thread Discord {DISCORD_THREAD_ID}")
-                        elif response.status == 401:
-                            reason = f"Unauthorized: Bot tidak diizinkan mengakses thread {DISCORD_THREAD_ID}"
-                            logger.error(f"{reason}: {response_text}")
-                            await handle_failed_message(message, retry_count=0, reason=reason)
-                        elif response.status == 429:
-                            retry_after = int(response.headers.get("Retry-After", 5))
-                            logger.warning(f"Rate limit tercapai. Menunggu {retry_after} detik...")
-                            await asyncio.sleep(retry_after)
-                            await message_queue.put((message, None))  # Tambahkan kembali ke antrian
-                        elif response.status == 400 and "blocked" in response_text.lower():
-                            logger.warning(f"Pesan diblokir oleh server Discord: {message[:50]}...")
-                            await handle_failed_message(message, retry_count=0, reason="Pesan diblokir oleh server")
-                        else:
-                            reason = f"Error API: {response.status} - {response_text}"
-                            logger.critical(f"Gagal mengirim pesan ke Discord: {reason}")
-                            await handle_failed_message(message, retry_count=0, reason=reason)
-            except Exception as e:
-                logger.critical(f"Exception saat mengirim pesan ke Discord: {str(e)}")
-                await handle_failed_message(message, media_path, retry_count=0, reason=f"Exception: {str(e)}")
-            finally:
-                if media_path and os.path.exists(media_path):
-                    try:
-                        os.remove(media_path)
-                        logger.info(f"File sementara dihapus: {media_path}")
-                    except Exception as e:
-                        logger.error(f"Gagal menghapus file sementara {media_path}: {str(e)}")
-                message_queue.task_done()
+    _workers_started = True
+    logger.info(f"Menjalankan {len(destinations)} pekerja Discord: {[d.name for d in destinations.values()]}")
+    await asyncio.gather(*(destination.run() for destination in list(destinations.values())))
@@ -0,0 +1,170 @@
+# entity_cache.py
+import asyncio
+import json
+import time
+from config import ENTITY_CACHE_TTL, ENTITY_CACHE_PATH, logger, write_json_atomic
+
+def normalize_chat_id(entity_id):
+    """
+    Mengubah ID entitas Telegram menjadi format ID channel yang dipakai di channels.json.
+
+    Args:
+        entity_id (int): ID entitas (positif) atau ID channel (negatif).
+
+    Returns:
+        int: ID channel bertanda.
+    """
+    return entity_id if entity_id < 0 else -1000000000000 - entity_id
+
+class EntityCache:
+    """
+    Cache username/judul channel dengan TTL yang disimpan ke disk.
+
+    Cache diisi saat startup dari daftar dialog (satu permintaan bertahap untuk semua
+    channel), sehingga perintah daftar dan tambah/hapus channel jarang perlu memanggil
+    get_entity. Channel yang belum ada di cache diambil sekaligus dalam satu permintaan.
+    """
+
+    def __init__(self, ttl=ENTITY_CACHE_TTL, path=ENTITY_CACHE_PATH):
+        """
+        Args:
+            ttl (int): Umur maksimum entri dalam detik.
+            path (str): Lokasi file cache JSON.
+        """
+        self.ttl = ttl
+        self.path = path
+        self._entries = {}  # chat_id -> (username, judul, waktu diperbarui)
+        self._by_username = {}  # username huruf kecil -> chat_id
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _fresh(self, entry):
+        return entry is not None and time.time() - entry[2] < self.ttl
+
+    def _store(self, entity):
+        chat_id = normalize_chat_id(entity.id)
+        username = getattr(entity, 'username', None)
+        title = getattr(entity, 'title', None) or getattr(entity, 'first_name', None)
+        old = self._entries.get(chat_id)
+        if old is not None and old[0]:
+            self._by_username.pop(old[0].lower(), None)
+        self._entries[chat_id] = (username, title, time.time())
+        if username:
+            self._by_username[username.lower()] = chat_id
+        return chat_id
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.error(f"Gagal memuat cache entitas {self.path}: {str(e)}")
+            return
+        for chat_id, (username, title, updated_at) in data.items():
+            self._entries[int(chat_id)] = (username, title, float(updated_at))
+            if username:
+                self._by_username[username.lower()] = int(chat_id)
+        logger.info(f"{len(self._entries)} entitas dimuat dari cache {self.path}")
+
+    def _write(self, data):
+        write_json_atomic(self.path, data)
+
+    async def save(self):
+        """
+        Menyimpan cache ke disk (penulisan atomik lewat file sementara).
+        """
+        data = {str(chat_id): list(entry) for chat_id, entry in self._entries.items()}
+        try:
+            await asyncio.to_thread(self._write, data)
+        except Exception as e:
+            logger.error(f"Gagal menyimpan cache entitas: {str(e)}")
+
+    async def warm(self, client):
+        """
+        Mengisi cache dari semua dialog channel/grup akun.
+
+        Args:
+            client: Objek TelegramClient.
+        """
+        count = 0
+        try:
+            async for dialog in client.iter_dialogs():
+                if dialog.is_channel or dialog.is_group:
+                    self._store(dialog.entity)
+                    count += 1
+        except Exception as e:
+            logger.error(f"Gagal mengisi cache entitas dari dialog: {str(e)}")
+        logger.info(f"Cache entitas diisi dari {count} dialog")
+        await self.save()
+
+    async def resolve(self, client, name_or_id):
+        """
+        Mengembalikan ID channel untuk username atau ID, memakai cache jika masih segar.
+
+        Args:
+            client: Objek TelegramClient.
+            name_or_id (str | int): Username (tanpa '@') atau ID channel.
+
+        Returns:
+            int: ID channel bertanda.
+        """
+        chat_id = None
+        if isinstance(name_or_id, int) or str(name_or_id).lstrip('-').isdigit():
+            chat_id = normalize_chat_id(int(name_or_id))
+        else:
+            chat_id = self._by_username.get(str(name_or_id).lower())
+        if chat_id is not None and self._fresh(self._entries.get(chat_id)):
+            self.hits += 1
+            return chat_id
+
+        self.misses += 1
+        entity = await client.get_entity(name_or_id if chat_id is None else chat_id)
+        chat_id = self._store(entity)
+        await self.save()
+        return chat_id
+
+    async def usernames(self, client, chat_ids):
+        """
+        Mengembalikan username untuk sekumpulan channel; entri yang hilang diambil sekaligus.
+
+        Args:
+            client: Objek TelegramClient.
+            chat_ids (list): Daftar ID channel.
+
+        Returns:
+            dict: chat_id -> username (None jika tidak punya username), tanpa entri untuk
+                channel yang tidak dapat diambil.
+        """
+        missing = [chat_id for chat_id in chat_ids if not self._fresh(self._entries.get(chat_id))]
+        self.hits += len(chat_ids) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            try:
+                entities = await client.get_entity(missing)
+            except Exception:
+                # Satu channel yang tidak valid menggagalkan permintaan gabungan; ambil satu per satu
+                entities = []
+                for chat_id in missing:
+                    try:
+                        entities.append(await client.get_entity(chat_id))
+                    except Exception as e:
+                        logger.warning(f"Gagal mengambil entitas {chat_id}: {str(e)}")
+            for entity in entities:
+                self._store(entity)
+            await self.save()
+        return {chat_id: self._entries[chat_id][0] for chat_id in chat_ids if chat_id in self._entries}
+
+    def stats(self):
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+entity_cache = EntityCache()
@@ -0,0 +1,44 @@
+# http_client.py
+import aiohttp
+from config import logger
+
+# Batas koneksi dan pengaturan keep-alive untuk sesi HTTP bersama
+CONNECTION_LIMIT = 100
+CONNECTION_LIMIT_PER_HOST = 10
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+
+_session = None
+
+def get_session():
+    """
+    Mengembalikan sesi aiohttp bersama yang dipakai semua penyedia terjemahan dan pekerja Discord.
+
+    Sesi dibuat saat pertama kali dibutuhkan dan memakai pool koneksi dengan
+    keep-alive serta cache DNS, sehingga koneksi TCP/TLS dipakai ulang antar permintaan.
+
+    Returns:
+        aiohttp.ClientSession: Sesi HTTP bersama.
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=CONNECTION_LIMIT,
+            limit_per_host=CONNECTION_LIMIT_PER_HOST,
+            ttl_dns_cache=DNS_CACHE_TTL,
+            use_dns_cache=True,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+        )
+        _session = aiohttp.ClientSession(connector=connector)
+        logger.info("Sesi HTTP bersama dibuat.")
+    return _session
+
+async def close_session():
+    """
+    Menutup sesi HTTP bersama beserta seluruh koneksinya.
+    """
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+        logger.info("Sesi HTTP bersama ditutup.")
+    _session = None
@@ -0,0 +1,129 @@
+# image_processing.py
+import asyncio
+import io
+import time
+from concurrent.futures import ProcessPoolExecutor
+from config import IMAGE_RECOMPRESS_ENABLED, IMAGE_MAX_DIMENSION, IMAGE_JPEG_QUALITY, IMAGE_PROCESS_WORKERS, logger
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow opsional; tanpa Pillow gambar diunggah apa adanya
+    Image = None
+
+# Tanda awal (magic bytes) format gambar -> (ekstensi, content type)
+_SIGNATURES = (
+    (b"\xff\xd8\xff", ("jpg", "image/jpeg")),
+    (b"\x89PNG\r\n\x1a\n", ("png", "image/png")),
+    (b"GIF87a", ("gif", "image/gif")),
+    (b"GIF89a", ("gif", "image/gif")),
+)
+
+def detect_format(data):
+    """
+    Mendeteksi format gambar dari magic bytes.
+
+    Args:
+        data (bytes): Isi gambar.
+
+    Returns:
+        tuple: (ekstensi, content type); default JPEG jika format tidak dikenali.
+    """
+    head = bytes(data[:12])
+    for signature, result in _SIGNATURES:
+        if head.startswith(signature):
+            return result
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp", "image/webp"
+    return "jpg", "image/jpeg"
+
+def _recompress(data, max_dimension, quality):
+    # Berjalan di proses pekerja: perkecil, encode ulang ke JPEG, dan buang metadata (EXIF)
+    with Image.open(io.BytesIO(data)) as image:
+        if getattr(image, "is_animated", False):
+            return data
+        image.thumbnail((max_dimension, max_dimension))
+        if image.mode not in ("RGB", "L"):
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            converted = image.convert("RGBA")
+            background.paste(converted, mask=converted.split()[-1])
+            image = background
+        output = io.BytesIO()
+        image.save(output, format="JPEG", quality=quality, optimize=True, progressive=True)
+    result = output.getvalue()
+    return result if len(result) < len(data) else data
+
+class ImageProcessor:
+    """
+    Tahap pemrosesan gambar sebelum diunggah ke Discord: deteksi format, perkecil ke
+    dimensi maksimum, encode ulang dengan kualitas target, dan buang metadata.
+
+    Encoding berjalan di process pool sehingga event loop dan GIL tidak tertahan.
+    Hasil hanya dipakai jika lebih kecil dari aslinya.
+    """
+
+    def __init__(self, enabled=IMAGE_RECOMPRESS_ENABLED, max_dimension=IMAGE_MAX_DIMENSION, quality=IMAGE_JPEG_QUALITY, workers=IMAGE_PROCESS_WORKERS):
+        """
+        Args:
+            enabled (bool): Aktifkan pemrosesan (butuh Pillow).
+            max_dimension (int): Sisi terpanjang maksimum dalam piksel.
+            quality (int): Kualitas JPEG hasil encode ulang (1-95).
+            workers (int): Jumlah proses pekerja.
+        """
+        self.enabled = enabled and Image is not None
+        if enabled and Image is None:
+            logger.warning("Pillow tidak terpasang, kompresi ulang gambar dinonaktifkan.")
+        self.max_dimension = max_dimension
+        self.quality = quality
+        self.workers = workers
+        self._executor = None
+        self.processed = 0
+        self.failed = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+        self.seconds = 0.0
+
+    async def process(self, data):
+        """
+        Memproses satu gambar.
+
+        Args:
+            data (bytes): Isi gambar asli.
+
+        Returns:
+            bytes: Gambar hasil pemrosesan, atau gambar asli jika dinonaktifkan/gagal/tidak lebih kecil.
+        """
+        if not self.enabled or detect_format(data)[0] == "gif":
+            return data
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        start = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, _recompress, data, self.max_dimension, self.quality)
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"Gagal mengompresi ulang gambar: {str(e)}")
+            return data
+        self.processed += 1
+        self.bytes_before += len(data)
+        self.bytes_after += len(result)
+        self.seconds += time.monotonic() - start
+        logger.debug(f"Gambar dikompresi ulang: {len(data)} -> {len(result)} byte")
+        return result
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'processed': self.processed,
+            'failed': self.failed,
+            'bytes_before': self.bytes_before,
+            'bytes_after': self.bytes_after,
+            'avg_seconds': self.seconds / self.processed if self.processed else 0.0,
+        }
+
+image_processor = ImageProcessor()
@@ -0,0 +1,135 @@
+# language_detection.py
+import asyncio
+import hashlib
+import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from langdetect import DetectorFactory, detect
+from langdetect.detector_factory import init_factory
+from config import logger
+
+# Buat hasil langdetect deterministik
+DetectorFactory.seed = 0
+
+INDONESIAN_STOPWORDS = frozenset("""
+yang dan di ke dari ini itu untuk dengan pada adalah tidak akan juga sudah dalam
+bisa ada atau karena oleh saat kami kita mereka telah sebagai lebih harus baru
+setelah masih hanya belum agar namun serta bagi tersebut menjadi sangat dapat
+tetapi jika kalau ia dia para secara hingga terhadap antara sejak melalui
+""".split())
+
+ENGLISH_STOPWORDS = frozenset("""
+the and of to in is for on that with as are was be by at this from it an has
+have will not or but its their they you we our been were which after new more
+than up over into about said says all can just out now today his her
+""".split())
+
+_WORD_PATTERN = re.compile(r"[^\W\d_]+", re.UNICODE)
+_NOISE_PATTERN = re.compile(r'https?://\S+|@\w+|#\w+|\$\w+|0x[a-fA-F0-9]+')
+
+class LanguageDetector:
+    """
+    Pendeteksi bahasa dua tahap dengan memoisasi.
+
+    Tahap pertama adalah pra-klasifikasi murah berbasis aksara dan skor kata umum
+    (stop-word) bahasa Indonesia/Inggris. Jika hasilnya tidak meyakinkan, langdetect
+    dijalankan di thread pool agar tidak menghentikan event loop. Profil langdetect
+    dimuat sekali di thread utama saat inisialisasi, karena pemuatan malas dari beberapa
+    thread pekerja sekaligus tidak aman.
+    """
+
+    def __init__(self, cache_size=5000, min_score=0.12, max_workers=2):
+        self.cache_size = cache_size
+        self.min_score = min_score
+        self._cache = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="langdetect")
+        self.fast_path = 0
+        self.fallback = 0
+        self.cache_hits = 0
+        self.failed = 0
+        init_factory()
+
+    def classify(self, text):
+        """
+        Pra-klasifikasi cepat tanpa langdetect.
+
+        Args:
+            text (str): Teks yang akan diperiksa.
+
+        Returns:
+            str: 'id', 'en', 'other', 'unknown' (tanpa huruf), atau None jika belum meyakinkan.
+        """
+        cleaned = _NOISE_PATTERN.sub(' ', text)
+        words = [w.lower() for w in _WORD_PATTERN.findall(cleaned)]
+        if not words:
+            return 'unknown'
+
+        letters = sum(len(w) for w in words)
+        ascii_letters = sum(1 for w in words for c in w if c.isascii())
+        # Aksara non-Latin (misalnya Kiril, CJK, Arab) pasti bukan bahasa Indonesia
+        if ascii_letters / letters < 0.5:
+            return 'other'
+
+        id_score = sum(1 for w in words if w in INDONESIAN_STOPWORDS) / len(words)
+        en_score = sum(1 for w in words if w in ENGLISH_STOPWORDS) / len(words)
+        if id_score >= self.min_score and id_score > en_score * 2:
+            return 'id'
+        if en_score >= self.min_score and en_score > id_score * 2:
+            return 'en'
+        return None
+
+    def _remember(self, key, lang):
+        self._cache[key] = lang
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def detect(self, text):
+        """
+        Mendeteksi bahasa teks.
+
+        Args:
+            text (str): Teks yang akan diperiksa.
+
+        Returns:
+            str: Kode bahasa (misalnya 'id', 'en'), 'other', 'unknown' (tanpa huruf), atau
+                None jika langdetect gagal (tidak disimpan di cache).
+        """
+        key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+        lang = self._cache.get(key)
+        if lang is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+            return lang
+
+        lang = self.classify(text)
+        if lang is not None:
+            self.fast_path += 1
+        else:
+            self.fallback += 1
+            loop = asyncio.get_running_loop()
+            try:
+                lang = await loop.run_in_executor(self._executor, detect, text)
+            except Exception as e:
+                # Kegagalan tidak disimpan agar teks yang sama dicoba lagi dan tetap diterjemahkan
+                self.failed += 1
+                logger.warning(f"langdetect gagal mendeteksi bahasa: {str(e)}")
+                return None
+
+        self._remember(key, lang)
+        return lang
+
+    def stats(self):
+        """
+        Mengembalikan statistik deteksi bahasa.
+
+        Returns:
+            dict: Jumlah hit cache, jalur cepat, fallback langdetect, dan kegagalan langdetect.
+        """
+        return {
+            'cache_hits': self.cache_hits,
+            'fast_path': self.fast_path,
+            'fallback': self.fallback,
+            'failed': self.failed,
+        }
+
+language_detector = LanguageDetector()
@@ -1,10 +1,9 @@
 import asyncio
-from telethon import TelegramClient, events
-from config import API_ID, API_HASH, PHONE, ADMINS, setup_logging, load_env, FILTERED_CHANNELS, UNFILTERED_CHANNELS, VIP_CHANNELS, SUMMARY_CHANNELS, SUMMARY_KEYWORDS, IMAGE_CHANNELS
+from telethon import TelegramClient
+from config import API_ID, API_HASH, PHONE, ADMINS, setup_logging, load_env, config_store, SUMMARY_KEYWORDS
 from utils import login
-from discord_utils import discord_worker, failed_message_queue
+from discord_utils import discord_worker, failed_message_queue, retry_scheduler
 from telegram_handlers import (
-    forward_message, 
     add_filter_channel, 
     add_unfilter_channel, 
     add_keyword, 
@@ -25,8 +24,20 @@ from telegram_handlers import (
     remove_keyword_summary,
     add_image_channel,
     remove_image_channel,
-    list_image_channel
+    list_image_channel,
+    show_stats,
+    forward_pipeline,
+    routing_table,
+    register_forward_handler
 )
+from translation_cache import translation_cache
+from http_client import close_session
+from outbox import outbox
+from command_dispatcher import CommandDispatcher
+from dedup import dedup_store
+from entity_cache import entity_cache
+from image_processing import image_processor
+from telegram_sender import telegram_sender
 
 # Inisialisasi logger
 logger = setup_logging()
@@ -38,81 +49,114 @@ async def main():
     # Buat antrian untuk kode verifikasi
     code_queue = asyncio.Queue()
 
+    # Satu dispatcher untuk semua perintah admin, hanya menerima chat pribadi dari ADMINS
+    dispatcher = CommandDispatcher(ADMINS)
+
     # Handler untuk menerima kode verifikasi dari admin (5 digit)
-    @client.on(events.NewMessage(pattern=r'^\d{5}$'))
     async def code_handler(event):
-        if str(event.sender_id) in ADMINS:
-            code = event.text.strip()
-            await code_queue.put(code)
-            await event.reply("Kode verifikasi diterima!")
-        else:
-            await event.reply("Maaf, hanya admin yang boleh mengirim kode.")
+        code = event.text.strip()
+        await code_queue.put(code)
+        await event.reply("Kode verifikasi diterima!")
+
+    dispatcher.pattern(code_handler, r'^\d{5}$')
+    dispatcher.register(client)
 
     # Jalankan login dengan code_queue
     await login(client, code_queue)
     logger.info("Memulai fungsi main()")
 
+    # Isi cache entitas channel dari daftar dialog di latar belakang
+    asyncio.create_task(entity_cache.warm(client))
+
     # Jalankan pekerja Discord di latar belakang
     asyncio.create_task(discord_worker())
+
+    # Jalankan penjadwal retry pesan Discord yang gagal
+    asyncio.create_task(retry_scheduler.run())
+
+    # Jalankan pekerja pengirim ke TARGET_CHANNEL (antrian prioritas dan penanganan FloodWait)
+    telegram_sender.start(client)
+
+    # Jalankan pekerja pipeline penerusan pesan
+    forward_pipeline.start()
+
+    # Simpan snapshot deduplikasi secara berkala
+    asyncio.create_task(dedup_store.run())
+
+    # Pantau file konfigurasi agar perubahan dari luar dimuat ulang tanpa restart
+    config_store.start()
     
-    # Jalankan tugas notifikasi pesan gagal
+    # Jalankan tugas notifikasi pesan gagal (Discord dan channel Telegram target)
     asyncio.create_task(notify_failed_messages_with_telegram(client))
+    asyncio.create_task(notify_failed_messages_with_telegram(client, telegram_sender.failed_queue, "Telegram"))
 
-    # Daftarkan handler untuk pesan baru
-    chats = FILTERED_CHANNELS + UNFILTERED_CHANNELS + VIP_CHANNELS + SUMMARY_CHANNELS + IMAGE_CHANNELS
-    if not chats:
+    # Daftarkan satu handler untuk pesan baru; filternya mengikuti tabel routing
+    if not len(routing_table):
         logger.warning("Tidak ada channel yang dipantau. Tambahkan channel ke channels.json atau gunakan perintah admin.")
-    else:
-        client.add_event_handler(forward_message, events.NewMessage(chats=chats))
-        logger.info(f"Handler forward_message terdaftar untuk channel: {chats}")
+    register_forward_handler(client)
 
-    # Daftarkan handler perintah admin dengan pola regex yang ketat
+    # Daftarkan perintah admin: prefiks perintah dan pola regex ketat untuk argumennya
     admin_commands = [
-        (add_filter_channel, r'^/addfilterch (.+)'),
-        (add_unfilter_channel, r'^/addunfilterch(.+)'),
-        (add_keyword, r'^/add_keyword (.+)'),
-        (remove_filter_channel, r'^/removefilterch (.+)'),
-        (remove_unfilter_channel, r'^/removeunfilterch (.+)'),
-        (remove_keyword, r'^/remove_keyword (.+)'),
-        (list_filter_channel, r'^/list_filter\b'),
-        (list_unfilter_channel, r'^/list_unfilter\b'),
-        (list_keyword, r'^/list_keyword\b'),
-        (add_vip_channel, r'^/addvip (.+)'),
-        (list_vip_channel, r'^/list_vip\b'),
-        (remove_vip_channel, r'^/removevip (.+)'),
-        (add_summary_channel, r'^/addsummarych (.+)'),
-        (remove_summary_channel, r'^/removesummary (.+)'),
-        (list_summary_channel, r'^/list_summary\b'),
-        (add_keyword_summary, r'^/addkeysummary (.+)'),
-        (list_keyword_summary, r'^/listkeywsummary\b'),
-        (remove_keyword_summary, r'^/removekeysummary (.+)'),
-        (add_image_channel, r'^/addimagech (.+)'),
-        (remove_image_channel, r'^/removeimagech (.+)'),
-        (list_image_channel, r'^/listimgch\b')
+        ('/addfilterch', add_filter_channel, r'^/addfilterch (.+)'),
+        ('/addunfilterch', add_unfilter_channel, r'^/addunfilterch(.+)'),
+        ('/add_keyword', add_keyword, r'^/add_keyword (.+)'),
+        ('/removefilterch', remove_filter_channel, r'^/removefilterch (.+)'),
+        ('/removeunfilterch', remove_unfilter_channel, r'^/removeunfilterch (.+)'),
+        ('/remove_keyword', remove_keyword, r'^/remove_keyword (.+)'),
+        ('/list_filter', list_filter_channel, r'^/list_filter\b'),
+        ('/list_unfilter', list_unfilter_channel, r'^/list_unfilter\b'),
+        ('/list_keyword', list_keyword, r'^/list_keyword\b'),
+        ('/addvip', add_vip_channel, r'^/addvip (.+)'),
+        ('/list_vip', list_vip_channel, r'^/list_vip\b'),
+        ('/removevip', remove_vip_channel, r'^/removevip (.+)'),
+        ('/addsummarych', add_summary_channel, r'^/addsummarych (.+)'),
+        ('/removesummary', remove_summary_channel, r'^/removesummary (.+)'),
+        ('/list_summary', list_summary_channel, r'^/list_summary\b'),
+        ('/addkeysummary', add_keyword_summary, r'^/addkeysummary (.+)'),
+        ('/listkeywsummary', list_keyword_summary, r'^/listkeywsummary\b'),
+        ('/removekeysummary', remove_keyword_summary, r'^/removekeysummary (.+)'),
+        ('/addimagech', add_image_channel, r'^/addimagech (.+)'),
+        ('/removeimagech', remove_image_channel, r'^/removeimagech (.+)'),
+        ('/listimgch', list_image_channel, r'^/listimgch\b'),
+        ('/stats', show_stats, r'^/stats\b')
     ]
 
-    for handler, pattern in admin_commands:
-        client.add_event_handler(handler, events.NewMessage(pattern=pattern))
+    for prefix, handler, pattern in admin_commands:
+        dispatcher.command(prefix, handler, pattern)
 
     # Jalankan klien hingga terputus
-    await client.run_until_disconnected()
+    try:
+        await client.run_until_disconnected()
+    finally:
+        await config_store.flush()
+        config_store.close()
+        await close_session()
+        await outbox.close()
+        translation_cache.close()
+        dedup_store.close()
+        image_processor.close()
 
-async def notify_failed_messages_with_telegram(client):
+async def notify_failed_messages_with_telegram(client, queue=failed_message_queue, service="Discord"):
     """
     Mengirim notifikasi pesan gagal ke admin melalui Telegram.
+
+    Args:
+        client: Objek TelegramClient.
+        queue (asyncio.Queue): Antrian (pesan, alasan) yang gagal dikirim.
+        service (str): Nama layanan tujuan untuk teks notifikasi.
     """
     while True:
-        message, reason = await failed_message_queue.get()
+        message, reason = await queue.get()
         for admin in ADMINS:
             try:
                 if message:
-                    await client.send_message(int(admin), f"Pesan gagal dikirim ke Discord: {message[:100]}...\nAlasan: {reason}")
+                    await client.send_message(int(admin), f"Pesan gagal dikirim ke {service}: {message[:100]}...\nAlasan: {reason}")
                 else:
-                    await client.send_message(int(admin), f"Error Discord: {reason}")
+                    await client.send_message(int(admin), f"Error {service}: {reason}")
                 logger.info(f"Notifikasi pesan gagal dikirim ke admin {admin}: {message[:50] if message else reason}...")
             except Exception as e:
                 logger.error(f"Gagal mengirim notifikasi ke admin {admin}: {str(e)}")
-        failed_message_queue.task_done()
+        queue.task_done()
 
 if __name__ == "__main__":
     load_env()  # Muat variabel lingkungan dari .env
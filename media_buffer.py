@@ -0,0 +1,87 @@
+# media_buffer.py
+import asyncio
+import os
+import tempfile
+from config import MEDIA_MEMORY_BUDGET, MEDIA_SPILL_THRESHOLD, logger
+
+class MediaBuffer:
+    """
+    Anggaran memori untuk media yang menunggu diunggah ke Discord.
+
+    Media disimpan sebagai bytes di memori dan diunggah langsung tanpa file sementara.
+    Hanya media di atas ambang ukuran, atau saat anggaran memori habis, yang ditulis ke
+    disk (di thread terpisah agar event loop tidak menunggu I/O).
+    """
+
+    def __init__(self, budget=MEDIA_MEMORY_BUDGET, spill_threshold=MEDIA_SPILL_THRESHOLD):
+        """
+        Args:
+            budget (int): Total byte media yang boleh ditahan di memori.
+            spill_threshold (int): Media lebih besar dari ini selalu ditulis ke disk.
+        """
+        self.budget = budget
+        self.spill_threshold = spill_threshold
+        self.in_memory = 0
+        self.spilled = 0
+
+    async def admit(self, data, suffix=".jpg"):
+        """
+        Menerima media hasil unduhan dan memutuskan apakah disimpan di memori atau di disk.
+
+        Args:
+            data (bytes): Isi media.
+            suffix (str): Akhiran nama file jika media ditulis ke disk.
+
+        Returns:
+            tuple: (bytes atau None, path file atau None).
+        """
+        size = len(data)
+        if size <= self.spill_threshold and self.in_memory + size <= self.budget:
+            self.in_memory += size
+            return data, None
+        path = await asyncio.to_thread(self._write, data, suffix)
+        self.spilled += 1
+        logger.info(f"Media {size} byte ditulis ke disk ({path}); memori media terpakai {self.in_memory}/{self.budget} byte")
+        return None, path
+
+    @staticmethod
+    def _write(data, suffix):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        return path
+
+    async def spill(self, data, suffix=".jpg"):
+        """
+        Memindahkan media yang sudah diterima di memori ke disk dan mengembalikan anggarannya.
+
+        Args:
+            data (bytes): Isi media yang sebelumnya diterima lewat admit.
+            suffix (str): Akhiran nama file.
+
+        Returns:
+            str: Path file media.
+        """
+        path = await asyncio.to_thread(self._write, data, suffix)
+        self.release(data)
+        self.spilled += 1
+        return path
+
+    def release(self, data):
+        """
+        Mengembalikan anggaran memori setelah media selesai diproses.
+
+        Args:
+            data (bytes): Media yang dilepas (None diabaikan).
+        """
+        if data is not None:
+            self.in_memory = max(0, self.in_memory - len(data))
+
+    def stats(self):
+        return {
+            'in_memory': self.in_memory,
+            'budget': self.budget,
+            'spilled': self.spilled,
+        }
+
+media_buffer = MediaBuffer()
@@ -0,0 +1,153 @@
+# media_cache.py
+import hashlib
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qs
+from config import MEDIA_CACHE_SIZE, MEDIA_URL_TTL, logger
+
+class MediaCache:
+    """
+    Cache media beralamat konten untuk gambar yang diposting ulang di beberapa channel.
+
+    Dua indeks dipakai: ID foto Telegram (id + access_hash) -> hash isi, dan hash isi ->
+    gambar siap unggah (sudah dikompresi ulang). Foto yang sama tidak perlu diunduh lagi,
+    dan file identik dari sumber berbeda tidak perlu diproses lagi. Setelah diunggah, URL
+    lampiran Discord per tujuan juga diingat sehingga repost cukup mengirim tautan.
+    Isi gambar dibatasi total ukuran byte dengan pengusiran LRU.
+    """
+
+    def __init__(self, max_bytes=MEDIA_CACHE_SIZE, url_ttl=MEDIA_URL_TTL, max_entries=10000):
+        """
+        Args:
+            max_bytes (int): Total ukuran gambar yang disimpan di memori.
+            url_ttl (int): Umur maksimum URL lampiran Discord yang dipakai ulang, dalam detik.
+            max_entries (int): Jumlah maksimum entri indeks foto dan URL.
+        """
+        self.max_bytes = max_bytes
+        self.url_ttl = url_ttl
+        self.max_entries = max_entries
+        self._photos = OrderedDict()  # (photo_id, access_hash) -> hash isi
+        self._blobs = OrderedDict()  # hash isi -> bytes siap unggah
+        self._urls = OrderedDict()  # (hash isi, target Discord) -> (url, kedaluwarsa)
+        self.size = 0
+        self.photo_hits = 0
+        self.content_hits = 0
+        self.url_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def photo_key(media):
+        """
+        Mengembalikan kunci foto Telegram (id, access_hash) dari media, atau None.
+        """
+        photo = getattr(media, 'photo', None)
+        if photo is None or getattr(photo, 'id', None) is None:
+            return None
+        return (photo.id, getattr(photo, 'access_hash', None))
+
+    @staticmethod
+    def digest(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def lookup_photo(self, photo_key):
+        """
+        Mencari gambar berdasarkan ID foto Telegram tanpa perlu mengunduh.
+
+        Returns:
+            tuple: (hash isi, bytes) atau None jika tidak ada di cache.
+        """
+        if photo_key is None:
+            return None
+        digest = self._photos.get(photo_key)
+        if digest is None or digest not in self._blobs:
+            self.misses += 1
+            return None
+        self._photos.move_to_end(photo_key)
+        self._blobs.move_to_end(digest)
+        self.photo_hits += 1
+        data = self._blobs[digest]
+        self.bytes_saved += len(data)
+        return digest, data
+
+    def lookup_content(self, digest):
+        """
+        Mencari gambar siap unggah berdasarkan hash isi unduhan mentah.
+
+        Returns:
+            bytes: Gambar siap unggah, atau None.
+        """
+        data = self._blobs.get(digest)
+        if data is not None:
+            self._blobs.move_to_end(digest)
+            self.content_hits += 1
+        return data
+
+    def put(self, photo_key, digest, data):
+        """
+        Menyimpan gambar siap unggah.
+
+        Args:
+            photo_key (tuple): Kunci foto Telegram (boleh None).
+            digest (str): Hash isi unduhan mentah.
+            data (bytes): Gambar siap unggah.
+        """
+        if photo_key is not None:
+            self._photos[photo_key] = digest
+            self._photos.move_to_end(photo_key)
+            while len(self._photos) > self.max_entries:
+                self._photos.popitem(last=False)
+        if digest in self._blobs or len(data) > self.max_bytes:
+            return
+        self._blobs[digest] = data
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, evicted = self._blobs.popitem(last=False)
+            self.size -= len(evicted)
+
+    def url_for(self, digest, target):
+        """
+        Mengembalikan URL lampiran Discord yang masih berlaku untuk gambar di tujuan tertentu.
+        """
+        entry = self._urls.get((digest, target))
+        if entry is None:
+            return None
+        url, expires_at = entry
+        if time.time() >= expires_at:
+            del self._urls[(digest, target)]
+            return None
+        self.url_hits += 1
+        return url
+
+    def remember_url(self, digest, target, url):
+        """
+        Mengingat URL lampiran Discord hasil unggahan.
+
+        URL CDN Discord bertanda tangan memiliki parameter `ex` (waktu kedaluwarsa heksadesimal);
+        URL dipakai ulang paling lama sampai satu menit sebelum waktu itu.
+        """
+        expires_at = time.time() + self.url_ttl
+        try:
+            expiry = parse_qs(urlparse(url).query).get('ex')
+            if expiry:
+                expires_at = min(expires_at, int(expiry[0], 16) - 60)
+        except ValueError:
+            logger.debug(f"Parameter kedaluwarsa URL lampiran tidak valid: {url}")
+        self._urls[(digest, target)] = (url, expires_at)
+        self._urls.move_to_end((digest, target))
+        while len(self._urls) > self.max_entries:
+            self._urls.popitem(last=False)
+
+    def stats(self):
+        return {
+            'size': self.size,
+            'max_bytes': self.max_bytes,
+            'entries': len(self._blobs),
+            'photo_hits': self.photo_hits,
+            'content_hits': self.content_hits,
+            'url_hits': self.url_hits,
+            'misses': self.misses,
+            'bytes_saved': self.bytes_saved,
+        }
+
+media_cache = MediaCache()
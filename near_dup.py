@@ -0,0 +1,132 @@
+# near_dup.py
+import hashlib
+import re
+import time
+from collections import deque
+from config import NEAR_DUP_THRESHOLD, NEAR_DUP_WINDOW
+
+_URL_PATTERN = re.compile(r'https?://\S+|www\.\S+|@\w+')
+_WORD_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+def _features(text):
+    words = _WORD_PATTERN.findall(_URL_PATTERN.sub(' ', text.lower()))
+    # Unigram dan bigram kata agar perbedaan urutan kecil tetap menghasilkan sidik jari dekat
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])], len(words)
+
+def simhash(text):
+    """
+    Menghitung SimHash 64-bit dari teks yang dinormalkan.
+
+    Args:
+        text (str): Teks pesan.
+
+    Returns:
+        tuple: (sidik jari 64-bit, jumlah kata).
+    """
+    features, word_count = _features(text)
+    weights = [0] * 64
+    for feature in features:
+        value = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint, word_count
+
+class NearDuplicateDetector:
+    """
+    Pendeteksi berita hampir sama lintas channel berbasis SimHash dengan indeks LSH.
+
+    Sidik jari 64-bit dibagi menjadi (threshold + 1) pita. Dua sidik jari dengan jarak
+    Hamming <= threshold pasti sama persis di minimal satu pita, sehingga kandidat cukup
+    dicari lewat lookup dict per pita, bukan dibandingkan dengan semua pesan di jendela.
+    """
+
+    def __init__(self, threshold=NEAR_DUP_THRESHOLD, window=NEAR_DUP_WINDOW, min_words=5):
+        """
+        Args:
+            threshold (int): Jarak Hamming maksimum agar dua pesan dianggap sama (0 = nonaktif).
+            window (float): Lama jendela waktu dalam detik.
+            min_words (int): Pesan dengan kata lebih sedikit dari ini tidak diperiksa.
+        """
+        self.threshold = threshold
+        self.window = window
+        self.min_words = min_words
+        bands = threshold + 1
+        size = 64 // bands
+        self._bands = [(i * size, 64 - i * size if i == bands - 1 else size) for i in range(bands)]
+        self._buckets = {}  # (indeks pita, nilai pita) -> set ID entri
+        self._entries = {}  # ID entri -> (sidik jari, chat_id)
+        self._order = deque()  # (waktu, ID entri)
+        self._next_id = 0
+        self.checked = 0
+        self.suppressed = 0
+
+    def _band_keys(self, fingerprint):
+        return [(index, fingerprint >> start & ((1 << width) - 1)) for index, (start, width) in enumerate(self._bands)]
+
+    def _expire(self, now):
+        cutoff = now - self.window
+        while self._order and self._order[0][0] < cutoff:
+            _, entry_id = self._order.popleft()
+            fingerprint, _ = self._entries.pop(entry_id)
+            for key in self._band_keys(fingerprint):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(entry_id)
+                    if not bucket:
+                        del self._buckets[key]
+
+    def check(self, text, chat_id=None):
+        """
+        Memeriksa apakah teks hampir sama dengan pesan dari channel lain di jendela waktu,
+        lalu mencatatnya. Pesan serupa dari channel yang sama tidak dianggap duplikat.
+
+        Args:
+            text (str): Teks pesan asli (sebelum terjemahan).
+            chat_id (int, optional): ID chat sumber.
+
+        Returns:
+            int: chat_id sumber pesan serupa jika duplikat, None jika pesan baru.
+        """
+        if not self.threshold or not text:
+            return None
+        fingerprint, word_count = simhash(text)
+        if word_count < self.min_words:
+            return None
+
+        now = time.time()
+        self._expire(now)
+        self.checked += 1
+        band_keys = self._band_keys(fingerprint)
+        candidates = set()
+        for key in band_keys:
+            candidates.update(self._buckets.get(key, ()))
+        for entry_id in candidates:
+            other_fingerprint, other_chat = self._entries[entry_id]
+            if chat_id is not None and other_chat == chat_id:
+                # Hanya berita dari channel lain yang ditekan; pembaruan dari channel yang sama tetap diteruskan
+                continue
+            if bin(fingerprint ^ other_fingerprint).count('1') <= self.threshold:
+                self.suppressed += 1
+                return other_chat
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (fingerprint, chat_id)
+        self._order.append((now, entry_id))
+        for key in band_keys:
+            self._buckets.setdefault(key, set()).add(entry_id)
+        return None
+
+    def stats(self):
+        return {
+            'checked': self.checked,
+            'suppressed': self.suppressed,
+            'window_size': len(self._entries),
+            'threshold': self.threshold,
+        }
+
+near_duplicate_detector = NearDuplicateDetector()
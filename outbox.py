@@ -0,0 +1,266 @@
+# outbox.py
+import asyncio
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import OUTBOX_PATH, logger
+from priority_queue import DEFAULT_TIER
+
+def _encode_attachments(attachments):
+    if not attachments or not any(attachments.values()):
+        return None
+    return json.dumps(attachments)
+
+def _decode_attachments(value):
+    if not value:
+        return {}
+    try:
+        return json.loads(value)
+    except ValueError:
+        logger.warning(f"Data lampiran outbox tidak valid: {value[:100]}")
+        return {}
+
+class Outbox:
+    """
+    Antrian keluar persisten berbasis SQLite (mode WAL) untuk pesan Discord.
+
+    Setiap pesan dicatat sebelum masuk antrian memori dan baru dihapus (ack) setelah
+    berhasil dikirim atau gagal permanen, sehingga pesan yang tertunda dapat dipulihkan
+    setelah crash atau restart. Commit (fsync) dikumpulkan per batch agar durabilitas
+    tidak menambah latensi per pesan. Semua operasi SQLite berjalan di satu thread khusus
+    sehingga event loop tidak pernah menunggu disk.
+    """
+
+    def __init__(self, path=OUTBOX_PATH, flush_interval=0.2, batch_size=100):
+        """
+        Args:
+            path (str): Lokasi file database SQLite.
+            flush_interval (float): Jeda maksimum sebelum perubahan di-commit, dalam detik.
+            batch_size (int): Jumlah perubahan yang memicu commit segera.
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="outbox")
+        self._conn = None
+        self._pending_changes = 0
+        self._flush_handle = None
+        self._tasks = set()  # Referensi kuat ke tugas flush yang sedang berjalan
+        # Hanya pesan dari proses sebelumnya yang dipulihkan; pesan baru sudah ada di antrian memori
+        self._started_at = time.time()
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level="DEFERRED")
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=FULL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, target TEXT NOT NULL, content TEXT NOT NULL, "
+                "media_path TEXT, attempts INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(outbox)")}
+            if "tier" not in columns:
+                self._conn.execute(f"ALTER TABLE outbox ADD COLUMN tier INTEGER NOT NULL DEFAULT {DEFAULT_TIER}")
+            if "attachments" not in columns:
+                self._conn.execute("ALTER TABLE outbox ADD COLUMN attachments TEXT")
+            self._conn.commit()
+        return self._conn
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _insert(self, target, content, media_path, attempts, tier, attachments):
+        cursor = self._connect().execute(
+            "INSERT INTO outbox (target, content, media_path, attempts, tier, attachments, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (target, content, media_path, attempts, tier, _encode_attachments(attachments), time.time())
+        )
+        return cursor.lastrowid
+
+    def _delete(self, ids):
+        self._connect().executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+
+    def _set_attempts(self, ids, attempts):
+        self._connect().executemany("UPDATE outbox SET attempts = ? WHERE id = ?", [(attempts, i) for i in ids])
+
+    def _set_attachments(self, row_id, attachments):
+        self._connect().execute("UPDATE outbox SET attachments = ? WHERE id = ?", (_encode_attachments(attachments), row_id))
+
+    def _commit(self):
+        if self._conn is not None:
+            self._conn.commit()
+
+    def _load_pending(self):
+        rows = self._connect().execute(
+            "SELECT id, target, content, media_path, attempts, tier, attachments FROM outbox WHERE created_at < ? ORDER BY id",
+            (self._started_at,)
+        ).fetchall()
+        return [row[:6] + (_decode_attachments(row[6]),) for row in rows]
+
+    def _load_ids(self, ids):
+        placeholders = ",".join("?" * len(ids))
+        rows = self._connect().execute(
+            f"SELECT id, target, content, media_path, attempts, tier, attachments FROM outbox WHERE id IN ({placeholders}) ORDER BY id",
+            ids
+        ).fetchall()
+        return [row[:6] + (_decode_attachments(row[6]),) for row in rows]
+
+    def _changed(self, count=1):
+        self._pending_changes += count
+        if self._pending_changes >= self.batch_size:
+            self._schedule_flush(0)
+        elif self._flush_handle is None:
+            self._schedule_flush(self.flush_interval)
+
+    def _schedule_flush(self, delay):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        loop = asyncio.get_running_loop()
+        self._flush_handle = loop.call_later(delay, self._spawn_flush)
+
+    def _spawn_flush(self):
+        task = asyncio.ensure_future(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self):
+        """
+        Meng-commit semua perubahan yang tertunda ke disk.
+        """
+        self._flush_handle = None
+        if not self._pending_changes:
+            return
+        self._pending_changes = 0
+        try:
+            await self._run(self._commit)
+        except Exception as e:
+            logger.error(f"Gagal meng-commit outbox: {str(e)}")
+
+    async def add(self, target, content, media_path=None, attempts=0, tier=DEFAULT_TIER, attachments=None):
+        """
+        Mencatat pesan baru di outbox.
+
+        Args:
+            target (str): Tujuan Discord pesan.
+            content (str): Isi pesan.
+            media_path (str, optional): Path file media.
+            attempts (int): Jumlah percobaan yang sudah dilakukan.
+            tier (int): Tingkat prioritas pesan.
+            attachments (dict, optional): Lampiran yang tersimpan di disk:
+                {'paths': [...], 'keys': [...], 'urls': [...]}.
+
+        Returns:
+            int: ID baris outbox, atau None jika pencatatan gagal.
+        """
+        try:
+            row_id = await self._run(self._insert, target, content, media_path, attempts, tier, attachments)
+        except Exception as e:
+            logger.error(f"Gagal mencatat pesan ke outbox: {str(e)}")
+            return None
+        self._changed()
+        return row_id
+
+    async def ack(self, ids):
+        """
+        Menghapus pesan dari outbox setelah selesai diproses.
+
+        Args:
+            ids (list): Daftar ID baris outbox.
+        """
+        ids = [i for i in ids if i is not None]
+        if not ids:
+            return
+        try:
+            await self._run(self._delete, ids)
+        except Exception as e:
+            logger.error(f"Gagal menghapus pesan dari outbox: {str(e)}")
+            return
+        self._changed(len(ids))
+
+    async def set_attempts(self, ids, attempts):
+        """
+        Menyimpan jumlah percobaan terbaru untuk pesan yang akan di-retry.
+
+        Args:
+            ids (list): Daftar ID baris outbox.
+            attempts (int): Jumlah percobaan.
+        """
+        ids = [i for i in ids if i is not None]
+        if not ids:
+            return
+        try:
+            await self._run(self._set_attempts, ids, attempts)
+        except Exception as e:
+            logger.error(f"Gagal memperbarui percobaan di outbox: {str(e)}")
+            return
+        self._changed(len(ids))
+
+    async def set_attachments(self, row_id, attachments):
+        """
+        Memperbarui lampiran yang tersimpan di disk untuk satu pesan.
+
+        Args:
+            row_id (int): ID baris outbox.
+            attachments (dict): {'paths': [...], 'keys': [...], 'urls': [...]}.
+        """
+        if row_id is None:
+            return
+        try:
+            await self._run(self._set_attachments, row_id, attachments)
+        except Exception as e:
+            logger.error(f"Gagal memperbarui lampiran di outbox: {str(e)}")
+            return
+        self._changed()
+
+    async def recover(self):
+        """
+        Memuat semua pesan yang belum selesai dari outbox (dipakai saat startup).
+
+        Returns:
+            list: Daftar tuple (id, target, content, media_path, attempts, tier, attachments).
+        """
+        try:
+            return await self._run(self._load_pending)
+        except Exception as e:
+            logger.error(f"Gagal memulihkan pesan dari outbox: {str(e)}")
+            return []
+
+    async def load(self, ids):
+        """
+        Memuat pesan tertentu dari outbox (dipakai untuk memasukkan kembali pesan yang di-spill).
+
+        Args:
+            ids (list): Daftar ID baris outbox.
+
+        Returns:
+            list: Daftar tuple (id, target, content, media_path, attempts, tier, attachments).
+        """
+        ids = [i for i in ids if i is not None]
+        if not ids:
+            return []
+        try:
+            return await self._run(self._load_ids, ids)
+        except Exception as e:
+            logger.error(f"Gagal memuat pesan dari outbox: {str(e)}")
+            return []
+
+    async def close(self):
+        """
+        Meng-commit perubahan terakhir dan menutup database.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending_changes = 0
+        try:
+            await self._run(self._commit)
+            if self._conn is not None:
+                await self._run(self._conn.close)
+                self._conn = None
+        except Exception as e:
+            logger.error(f"Gagal menutup outbox: {str(e)}")
+        self._executor.shutdown(wait=True)
+
+outbox = Outbox()
@@ -0,0 +1,154 @@
+# pipeline.py
+import asyncio
+import time
+import zlib
+from collections import deque
+from config import logger
+
+class Stage:
+    """
+    Satu tahap pipeline dengan sejumlah pekerja (shard) dan antrian berbatas per pekerja.
+
+    Job dengan kunci yang sama selalu masuk ke shard yang sama, sehingga urutan job per
+    kunci (misalnya per channel sumber) tetap terjaga, sementara kunci berbeda diproses
+    paralel oleh pekerja yang berbeda.
+    """
+
+    def __init__(self, name, func, workers=4, queue_size=100):
+        """
+        Args:
+            name (str): Nama tahap (untuk log dan statistik).
+            func (callable): Fungsi async(job) yang mengembalikan job untuk tahap berikutnya,
+                atau None jika job berhenti di tahap ini.
+            workers (int): Jumlah pekerja paralel.
+            queue_size (int): Kapasitas antrian per pekerja; put menunggu saat penuh (backpressure).
+        """
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queues = []
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.busy = 0
+        self.durations = deque(maxlen=500)
+
+    def shard_for(self, key):
+        return zlib.crc32(str(key).encode('utf-8')) % self.workers
+
+    def depth(self):
+        return sum(queue.qsize() for queue in self.queues)
+
+    def stats(self):
+        ordered = sorted(self.durations)
+        return {
+            'name': self.name,
+            'workers': self.workers,
+            'busy': self.busy,
+            'depth': self.depth(),
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'avg': sum(ordered) / len(ordered) if ordered else 0.0,
+            'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0,
+        }
+
+class Pipeline:
+    """
+    Pipeline bertahap (misalnya ingest -> classify -> translate -> render -> dispatch)
+    dengan kumpulan pekerja berbatas per tahap.
+    """
+
+    def __init__(self, name, stages, on_error=None):
+        """
+        Args:
+            name (str): Nama pipeline.
+            stages (list): Daftar Stage sesuai urutan eksekusi.
+            on_error (callable, optional): Fungsi async(job, stage_name, exception) saat tahap gagal.
+        """
+        self.name = name
+        self.stages = stages
+        self.on_error = on_error
+        self.completed = 0
+        self.latencies = deque(maxlen=500)
+        self._tasks = []
+
+    def start(self):
+        """
+        Menjalankan semua pekerja pipeline (aman dipanggil lebih dari sekali).
+        """
+        if self._tasks:
+            return
+        for index, stage in enumerate(self.stages):
+            stage.queues = [asyncio.Queue(maxsize=stage.queue_size) for _ in range(stage.workers)]
+            for shard in range(stage.workers):
+                self._tasks.append(asyncio.create_task(self._worker(index, shard)))
+        logger.info(f"Pipeline {self.name} berjalan: {', '.join(f'{s.name}x{s.workers}' for s in self.stages)}")
+
+    async def submit(self, key, job):
+        """
+        Memasukkan job ke tahap pertama pipeline.
+
+        Args:
+            key: Kunci pengurutan (job dengan kunci sama diproses berurutan).
+            job: Objek job.
+        """
+        self.start()
+        await self._enqueue(0, key, job, time.monotonic())
+
+    async def _enqueue(self, index, key, job, started_at):
+        stage = self.stages[index]
+        await stage.queues[stage.shard_for(key)].put((key, job, started_at))
+
+    async def _worker(self, index, shard):
+        stage = self.stages[index]
+        queue = stage.queues[shard]
+        while True:
+            key, job, started_at = await queue.get()
+            stage.busy += 1
+            stage_start = time.monotonic()
+            failed = False
+            try:
+                result = await stage.func(job)
+            except Exception as e:
+                failed = True
+                stage.failed += 1
+                logger.critical(f"Tahap {stage.name} pipeline {self.name} gagal: {str(e)}")
+                if self.on_error is not None:
+                    try:
+                        await self.on_error(job, stage.name, e)
+                    except Exception as handler_error:
+                        logger.error(f"Penangan galat pipeline {self.name} gagal: {str(handler_error)}")
+                result = None
+            else:
+                stage.processed += 1
+            finally:
+                stage.busy -= 1
+                stage.durations.append(time.monotonic() - stage_start)
+                queue.task_done()
+
+            if result is None:
+                if not failed:
+                    stage.dropped += 1
+                continue
+            if index + 1 < len(self.stages):
+                await self._enqueue(index + 1, key, result, started_at)
+            else:
+                self.completed += 1
+                self.latencies.append(time.monotonic() - started_at)
+
+    def stats(self):
+        """
+        Mengembalikan statistik per tahap dan latensi end-to-end.
+
+        Returns:
+            dict: Statistik pipeline.
+        """
+        ordered = sorted(self.latencies)
+        return {
+            'stages': [stage.stats() for stage in self.stages],
+            'completed': self.completed,
+            'avg_latency': sum(ordered) / len(ordered) if ordered else 0.0,
+            'p95_latency': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0,
+        }
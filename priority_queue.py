@@ -0,0 +1,198 @@
+# priority_queue.py
+import asyncio
+import time
+from collections import deque
+
+# Tingkat prioritas per kategori channel (0 = tertinggi)
+CATEGORY_TIERS = {
+    'VIP': 0,
+    'SUMMARY': 1,
+    'FILTERED': 2,
+    'IMAGE': 3,
+    'UNFILTERED': 4,
+}
+DEFAULT_TIER = CATEGORY_TIERS['UNFILTERED']
+TIER_NAMES = {tier: name for name, tier in CATEGORY_TIERS.items()}
+
+# Bobot weighted-fair per tingkat: tingkat tinggi mendapat giliran lebih sering,
+# tetapi tingkat rendah tetap mendapat bagian sehingga tidak kelaparan
+TIER_WEIGHTS = {0: 16, 1: 8, 2: 4, 3: 2, 4: 1}
+
+# Kebijakan saat antrian penuh
+OVERFLOW_DROP_OLDEST = 'drop_oldest'
+OVERFLOW_DROP_LOWEST_TIER = 'drop_lowest_tier'
+OVERFLOW_SPILL = 'spill'
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_LOWEST_TIER, OVERFLOW_SPILL)
+
+def tier_for_category(category):
+    """
+    Mengembalikan tingkat prioritas untuk kategori channel.
+
+    Args:
+        category (str): Kategori channel (VIP, SUMMARY, FILTERED, IMAGE, UNFILTERED).
+
+    Returns:
+        int: Tingkat prioritas.
+    """
+    if not category:
+        return DEFAULT_TIER
+    return CATEGORY_TIERS.get(category.upper(), DEFAULT_TIER)
+
+class TieredQueue:
+    """
+    Antrian asinkron bertingkat dengan dequeue weighted-fair (smooth weighted round-robin).
+
+    Antarmukanya mengikuti asyncio.Queue (put, put_nowait, get, get_nowait, task_done,
+    qsize, empty). Setiap item memiliki atribut `tier`. Waktu tunggu setiap item dicatat
+    per tingkat untuk statistik.
+
+    Jika kapasitas diatur, put tidak pernah memblokir; item dikeluarkan sesuai kebijakan:
+        drop_oldest      - buang item tertua (di tingkat yang sama jika tingkat itu penuh).
+        drop_lowest_tier - buang item tertua dari tingkat prioritas terendah yang berisi item.
+        spill            - seperti drop_lowest_tier, tetapi item diserahkan ke on_shed untuk
+                           disimpan di disk dan dimasukkan kembali nanti.
+    """
+
+    def __init__(self, weights=None, capacity=None, tier_capacity=None, policy=OVERFLOW_DROP_LOWEST_TIER, on_shed=None):
+        """
+        Args:
+            weights (dict, optional): Bobot per tingkat.
+            capacity (int, optional): Kapasitas total antrian (None = tak terbatas).
+            tier_capacity (int, optional): Kapasitas per tingkat (None = tak terbatas).
+            policy (str): Kebijakan saat penuh: drop_oldest, drop_lowest_tier, atau spill.
+            on_shed (callable, optional): Dipanggil dengan (item, spilled) untuk setiap item yang dikeluarkan.
+        """
+        self.weights = dict(weights or TIER_WEIGHTS)
+        self.capacity = capacity
+        self.tier_capacity = tier_capacity
+        self.policy = policy
+        self.on_shed = on_shed
+        self.shed = {tier: 0 for tier in self.weights}
+        self.spilled = 0
+        self._tiers = {tier: deque() for tier in self.weights}
+        self._current = {tier: 0 for tier in self.weights}
+        self._size = 0
+        self._unfinished = 0
+        self._not_empty = asyncio.Event()
+        self._waits = {tier: deque(maxlen=500) for tier in self.weights}
+        self._dequeued = {tier: 0 for tier in self.weights}
+
+    def qsize(self):
+        return self._size
+
+    def empty(self):
+        return self._size == 0
+
+    def tier_size(self, tier):
+        return len(self._tiers.get(tier, ()))
+
+    def _tier_of(self, item):
+        tier = getattr(item, 'tier', DEFAULT_TIER)
+        return tier if tier in self._tiers else DEFAULT_TIER
+
+    def is_full(self):
+        return self.capacity is not None and self._size >= self.capacity
+
+    def fill_ratio(self):
+        """
+        Mengembalikan rasio keterisian antrian (0.0 jika tidak dibatasi).
+        """
+        if not self.capacity:
+            return 0.0
+        return self._size / self.capacity
+
+    def _pick_victim_tier(self, incoming_tier):
+        if self.tier_capacity is not None and len(self._tiers[incoming_tier]) >= self.tier_capacity:
+            return incoming_tier
+        if self.policy == OVERFLOW_DROP_OLDEST:
+            return min((tier for tier, items in self._tiers.items() if items), key=lambda tier: self._tiers[tier][0][0])
+        return max(tier for tier, items in self._tiers.items() if items)
+
+    def _shed(self, incoming_tier):
+        victim_tier = self._pick_victim_tier(incoming_tier)
+        if self.policy != OVERFLOW_DROP_OLDEST and victim_tier < incoming_tier:
+            # Semua item yang tersisa lebih penting dari item baru; item baru yang dikeluarkan
+            return False
+        _, victim = self._tiers[victim_tier].popleft()
+        self._size -= 1
+        self._unfinished -= 1
+        self._record_shed(victim_tier, victim)
+        return True
+
+    def _record_shed(self, tier, item):
+        spilled = self.policy == OVERFLOW_SPILL
+        if spilled:
+            self.spilled += 1
+        else:
+            self.shed[tier] += 1
+        if self.on_shed is not None:
+            self.on_shed(item, spilled)
+
+    def put_nowait(self, item):
+        tier = self._tier_of(item)
+        tier_full = self.tier_capacity is not None and len(self._tiers[tier]) >= self.tier_capacity
+        if (tier_full or self.is_full()) and not self._shed(tier):
+            self._record_shed(tier, item)
+            return
+        self._tiers[tier].append((time.monotonic(), item))
+        self._size += 1
+        self._unfinished += 1
+        self._not_empty.set()
+
+    async def put(self, item):
+        self.put_nowait(item)
+
+    def _select_tier(self):
+        # Smooth weighted round-robin hanya di antara tingkat yang berisi item
+        active = [tier for tier, items in self._tiers.items() if items]
+        total = 0
+        best = None
+        for tier in active:
+            self._current[tier] += self.weights[tier]
+            total += self.weights[tier]
+            if best is None or self._current[tier] > self._current[best]:
+                best = tier
+        self._current[best] -= total
+        return best
+
+    def get_nowait(self):
+        if not self._size:
+            raise asyncio.QueueEmpty
+        tier = self._select_tier()
+        enqueued_at, item = self._tiers[tier].popleft()
+        self._size -= 1
+        if not self._size:
+            self._not_empty.clear()
+        self._waits[tier].append(time.monotonic() - enqueued_at)
+        self._dequeued[tier] += 1
+        return item
+
+    async def get(self):
+        while not self._size:
+            await self._not_empty.wait()
+        return self.get_nowait()
+
+    def task_done(self):
+        if self._unfinished <= 0:
+            raise ValueError("task_done() dipanggil terlalu banyak kali")
+        self._unfinished -= 1
+
+    def stats(self):
+        """
+        Mengembalikan statistik waktu tunggu per tingkat.
+
+        Returns:
+            dict: Nama tingkat -> dict berisi jumlah antre, jumlah keluar, jumlah dibuang, rata-rata, p95, dan maksimum tunggu.
+        """
+        result = {}
+        for tier, waits in self._waits.items():
+            ordered = sorted(waits)
+            result[TIER_NAMES.get(tier, str(tier))] = {
+                'queued': len(self._tiers[tier]),
+                'dequeued': self._dequeued[tier],
+                'shed': self.shed[tier],
+                'avg_wait': sum(ordered) / len(ordered) if ordered else 0.0,
+                'p95_wait': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0,
+                'max_wait': ordered[-1] if ordered else 0.0,
+            }
+        return result
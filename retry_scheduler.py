@@ -0,0 +1,83 @@
+# retry_scheduler.py
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from config import logger
+
+class RetryScheduler:
+    """
+    Penjadwal retry berbasis heap yang memasukkan kembali pesan saat waktunya tiba.
+
+    Pesan yang gagal tidak lagi ditunggu di dalam loop pekerja; pesan disimpan di heap
+    berurutan waktu dan dimasukkan kembali ke antrian oleh task terpisah, sehingga
+    pengiriman pesan lain tetap berjalan selama masa tunggu retry.
+    """
+
+    def __init__(self, requeue, base_delay=60, max_delay=300):
+        """
+        Args:
+            requeue (callable): Fungsi async yang menerima item untuk dimasukkan kembali ke antrian.
+            base_delay (float): Jeda dasar retry pertama dalam detik.
+            max_delay (float): Jeda maksimum retry dalam detik.
+        """
+        self.requeue = requeue
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._heap = []
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def backoff(self, attempts):
+        """
+        Menghitung jeda exponential backoff dengan jitter untuk percobaan ke-N.
+
+        Args:
+            attempts (int): Jumlah percobaan yang sudah gagal (minimal 1).
+
+        Returns:
+            float: Jeda dalam detik.
+        """
+        ceiling = min(self.max_delay, self.base_delay * 2 ** max(0, attempts - 1))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def schedule(self, item, delay):
+        """
+        Menjadwalkan item untuk dimasukkan kembali setelah jeda tertentu.
+
+        Args:
+            item: Item antrian yang akan di-retry.
+            delay (float): Jeda dalam detik.
+        """
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._counter), item))
+        self._wakeup.set()
+
+    async def run(self):
+        """
+        Loop utama penjadwal: menunggu retry terdekat lalu memasukkannya kembali ke antrian.
+        """
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            due_at = self._heap[0][0]
+            delay = due_at - time.monotonic()
+            if delay > 0:
+                try:
+                    # Bangun lebih awal jika ada retry baru yang jatuh tempo lebih cepat
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, _, item = heapq.heappop(self._heap)
+            try:
+                await self.requeue(item)
+            except Exception as e:
+                logger.error(f"Gagal memasukkan kembali pesan retry ke antrian: {str(e)}")
@@ -0,0 +1,109 @@
+# routing.py
+from dataclasses import dataclass
+import config
+from config import logger
+from discord_utils import resolve_target
+
+# Template pesan per kategori: (Telegram, Discord). {text} = teks terjemahan, {source} = nama sumber
+CATEGORY_TEMPLATES = {
+    'IMAGE': ("{text} - {source}", "## {text} - {source}"),
+    'SUMMARY': ("{text} - {source}", "### {text} - {source}"),
+    'VIP': ("**{text} - {source}**", "### {text} - {source}"),
+    'FILTERED': ("{text} - {source}", "### {text} - {source}"),
+    'UNFILTERED': ("{text} - {source}", "{text} - {source}"),
+}
+
+# Urutan prioritas kategori teks jika satu channel terdaftar di beberapa daftar
+TEXT_CATEGORIES = (
+    ('SUMMARY', 'SUMMARY_CHANNELS'),
+    ('VIP', 'VIP_CHANNELS'),
+    ('FILTERED', 'FILTERED_CHANNELS'),
+    ('UNFILTERED', 'UNFILTERED_CHANNELS'),
+)
+
+@dataclass(frozen=True)
+class Route:
+    """
+    Aturan penerusan untuk satu channel sumber dan satu jenis pesan.
+    """
+    category: str
+    matcher: object = None  # KeywordMatcher, None jika semua pesan diteruskan
+    telegram_template: str = "{text} - {source}"
+    discord_template: str = "{text} - {source}"
+    discord_target: str = None
+
+class RoutingTable:
+    """
+    Indeks chat_id -> rute yang dihitung sekali dan dibangun ulang saat daftar channel berubah.
+
+    Pencarian rute per pesan cukup satu lookup dict, berapapun jumlah channel yang dipantau.
+    Indeks baru selalu dibangun di samping indeks lama lalu ditukar sekaligus, sehingga
+    pesan yang sedang diproses tidak pernah melihat indeks setengah jadi.
+    """
+
+    def __init__(self, matchers=None):
+        """
+        Args:
+            matchers (dict, optional): Kategori -> KeywordMatcher untuk kategori yang disaring.
+        """
+        self.matchers = dict(matchers or {})
+        self._routes = {}  # chat_id -> (rute teks, rute gambar)
+        self.version = 0
+
+    def _route(self, category, chat_id):
+        telegram_template, discord_template = CATEGORY_TEMPLATES[category]
+        return Route(
+            category=category,
+            matcher=self.matchers.get(category),
+            telegram_template=telegram_template,
+            discord_template=discord_template,
+            discord_target=resolve_target(category, chat_id),
+        )
+
+    def rebuild(self):
+        """
+        Membangun ulang indeks dari daftar channel di config lalu menukarnya secara atomik.
+        """
+        text_routes = {}
+        for category, list_name in TEXT_CATEGORIES:
+            for chat_id in getattr(config, list_name):
+                if chat_id not in text_routes:
+                    text_routes[chat_id] = self._route(category, chat_id)
+        image_chats = set(config.IMAGE_CHANNELS)
+
+        routes = {}
+        for chat_id in text_routes.keys() | image_chats:
+            image_route = self._route('IMAGE', chat_id) if chat_id in image_chats else None
+            routes[chat_id] = (text_routes.get(chat_id), image_route)
+
+        self._routes = routes
+        self.version += 1
+        logger.info(f"Tabel routing dibangun ulang (versi {self.version}): {len(routes)} channel")
+
+    def lookup(self, chat_id, is_photo=False):
+        """
+        Mengembalikan rute untuk pesan dari chat tertentu.
+
+        Args:
+            chat_id (int): ID chat sumber.
+            is_photo (bool): True jika pesan berisi foto.
+
+        Returns:
+            Route: Rute yang berlaku, atau None jika pesan tidak diteruskan.
+        """
+        entry = self._routes.get(chat_id)
+        if entry is None:
+            return None
+        text_route, image_route = entry
+        if is_photo and image_route is not None:
+            return image_route
+        return text_route
+
+    def contains(self, chat_id):
+        return chat_id in self._routes
+
+    def chat_ids(self):
+        return list(self._routes)
+
+    def __len__(self):
+        return len(self._routes)
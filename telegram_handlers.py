@@ -1,17 +1,66 @@
 # telegram_handlers.py
-import json
 import re
+import asyncio
 import os
-import tempfile
-from collections import deque
+from dataclasses import dataclass
 from telethon import events
 from telethon.tl.types import MessageMediaPhoto
-from config import FILTERED_CHANNELS, UNFILTERED_CHANNELS, VIP_CHANNELS, SUMMARY_CHANNELS, IMAGE_CHANNELS, KEYWORDS, SUMMARY_KEYWORDS, ADMINS, TARGET_CHANNEL, DISCORD_THREAD_ID, logger
-from utils import extract_username, contains_keyword, translate_text, remove_markdown
-from discord_utils import send_message_to_discord_thread
+from config import FILTERED_CHANNELS, UNFILTERED_CHANNELS, VIP_CHANNELS, SUMMARY_CHANNELS, IMAGE_CHANNELS, KEYWORDS, SUMMARY_KEYWORDS, ADMINS, TARGET_CHANNEL, logger, config_store
+from config import PIPELINE_WORKERS, PIPELINE_TRANSLATE_WORKERS, PIPELINE_QUEUE_SIZE
+from utils import extract_username, contains_keyword, translate_text, remove_markdown, KeywordMatcher, translation_router
+from discord_utils import send_message_to_discord_thread, failed_message_queue, rate_limiter, destinations, is_egress_saturated
+from translation_cache import translation_cache
+from language_detection import language_detector
+from pipeline import Pipeline, Stage
+from routing import Route, RoutingTable
+from dedup import dedup_store
+from near_dup import near_duplicate_detector
+from entity_cache import entity_cache
+from media_buffer import media_buffer
+from album import AlbumAggregator
+from image_processing import image_processor
+from media_cache import media_cache
+from telegram_sender import telegram_sender
+
+# Pencocok kata kunci terkompilasi, diperbarui setiap kali daftar kata kunci berubah
+keyword_matcher = KeywordMatcher(KEYWORDS)
+summary_keyword_matcher = KeywordMatcher(SUMMARY_KEYWORDS)
+
+# Indeks chat_id -> rute penerusan, dibangun ulang setiap kali daftar channel berubah
+routing_table = RoutingTable({'FILTERED': keyword_matcher, 'SUMMARY': summary_keyword_matcher})
+routing_table.rebuild()
+
+def on_config_reload(name):
+    """
+    Membangun ulang indeks kata kunci dan routing setelah file konfigurasi diubah dari luar.
+    
+    Args:
+        name (str): Nama file konfigurasi yang dimuat ulang.
+    """
+    if name == 'keywords.json':
+        keyword_matcher.reset(KEYWORDS)
+    elif name == 'summary_keywords.json':
+        summary_keyword_matcher.reset(SUMMARY_KEYWORDS)
+    else:
+        routing_table.rebuild()
+
+config_store.add_listener(on_config_reload)
+
+# Jumlah pesan yang diproses dalam mode hemat (tanpa terjemahan/unduhan) karena backpressure
+degraded_messages = 0
 
-# Gunakan deque untuk melacak pesan yang sudah diproses (batas maksimal 1000 pesan)
-processed_messages = deque(maxlen=1000)
+def register_forward_handler(client):
+    """
+    Mendaftarkan satu handler penerusan yang berlaku selama bot berjalan.
+    
+    Filter chat membaca routing_table pada setiap pesan, sehingga perubahan daftar channel
+    cukup membangun ulang indeks tanpa mendaftarkan ulang handler.
+    
+    Args:
+        client: Objek TelegramClient.
+    """
+    client.add_event_handler(forward_message, events.NewMessage(func=lambda e: routing_table.contains(e.chat_id)))
+    logger.info(f"Handler forward_message terdaftar untuk {len(routing_table)} channel: {routing_table.chat_ids()}")
 
 async def update_monitored_chats(client):
     """
@@ -20,17 +69,11 @@ async def update_monitored_chats(client):
     Args:
         client: Objek TelegramClient.
     """
-    chats = FILTERED_CHANNELS + UNFILTERED_CHANNELS + VIP_CHANNELS + SUMMARY_CHANNELS + IMAGE_CHANNELS
-    if not chats:
+    routing_table.rebuild()
+    if not len(routing_table):
         logger.warning("Tidak ada channel yang dipantau.")
         return
-    
-    try:
-        client.add_event_handler(forward_message, events.NewMessage(chats=chats))
-        logger.info(f"Channel yang dipantau diperbarui: {chats}")
-    except Exception as e:
-        logger.critical(f"Gagal memperbarui channel yang dipantau: {str(e)}")
-        raise
+    logger.info(f"Channel yang dipantau diperbarui: {routing_table.chat_ids()}")
 
 def transform_summary_message(message, for_discord=False):
     """
@@ -63,110 +106,254 @@ def transform_summary_message(message, for_discord=False):
 
     return important_message.strip()
 
+@dataclass
+class ForwardJob:
+    """
+    Status satu pesan (atau satu album) yang sedang melewati pipeline penerusan.
+    """
+    event: object
+    message: object
+    chat_id: int
+    album: list = None  # Semua pesan album; `message` adalah bagian yang membawa caption
+    source_username: str = ""
+    route: Route = None
+    category: str = None
+    saturated: bool = False
+    translated_text: str = ""
+    telegram_text: str = ""
+    discord_text: str = ""
+
+async def ingest_stage(job):
+    """
+    Tahap ingest: membuang pesan duplikat dan menyiapkan nama sumber.
+    """
+    message = job.message
+    if job.album:
+        job.album = [part for part in job.album if dedup_store.check_and_add(job.chat_id, part.id)]
+        if not job.album:
+            logger.debug(f"Album {job.chat_id}:{message.grouped_id} sudah diproses, dilewati.")
+            return None
+        job.message = message = next((part for part in job.album if part.text), job.album[0])
+    elif not dedup_store.check_and_add(job.chat_id, message.id):
+        logger.debug(f"Pesan {job.chat_id}:{message.id} sudah diproses, dilewati.")
+        return None
+    
+    chat = job.event.chat
+    job.source_username = f"@{chat.username}" if chat and chat.username else f"Channel ID: {job.chat_id}"
+    logger.info(f"Memproses pesan {message.id} dari {job.chat_id}: {message.text}")
+    return job
+
+async def classify_stage(job):
+    """
+    Tahap klasifikasi: menentukan kategori channel dan menyaring kata kunci sebelum terjemahan.
+    """
+    global degraded_messages
+    message = job.message
+    chat_id = job.chat_id
+
+    is_photo = bool(message.media) and isinstance(message.media, MessageMediaPhoto)
+    route = routing_table.lookup(chat_id, is_photo)
+    if route is None:
+        return None
+    if route.matcher is not None and not (message.text and contains_keyword(message.text, route.matcher)):
+        logger.info(f"Pesan dari {chat_id} tidak mengandung kata kunci {route.category}: {message.text}")
+        return None
+    job.route = route
+    job.category = route.category
+
+    # Berita yang sama dari channel lain dalam jendela waktu tidak diterjemahkan dan dikirim ulang
+    if route.category != "IMAGE":
+        duplicate_of = near_duplicate_detector.check(message.text, chat_id)
+        if duplicate_of is not None:
+            logger.info(f"Pesan {message.id} dari {chat_id} hampir sama dengan pesan dari {duplicate_of}, dilewati.")
+            return None
+
+    # Terjemahan tetap dilakukan untuk Telegram; saat antrian Discord jenuh hanya salinan
+    # Discord yang diturunkan kualitasnya (gambar tidak diunduh dan diunggah)
+    job.saturated = job.category == "IMAGE" and is_egress_saturated(target=route.discord_target)
+    if job.saturated:
+        degraded_messages += 1
+        logger.warning(f"Antrian Discord jenuh, pesan {message.id} dari {chat_id} dikirim ke Discord tanpa lampiran.")
+    return job
+
+async def translate_stage(job):
+    """
+    Tahap terjemahan.
+    """
+    text = job.message.text
+    if job.category == "IMAGE":
+        if text:
+            translated_text = await translate_text(text.strip())
+            job.translated_text = remove_markdown(translated_text)  # Hapus markdown
+        else:
+            job.translated_text = ""
+    elif text:
+        job.translated_text = await translate_text(text.strip())
+    else:
+        job.translated_text = "(Tidak ada teks)"
+    return job
+
+async def render_stage(job):
+    """
+    Tahap render: menyusun teks akhir untuk Telegram dan Discord dari template rute.
+    """
+    route = job.route
+    source_username = job.source_username
+    if job.category == "IMAGE" and not job.translated_text:
+        job.telegram_text = job.discord_text = f"- {source_username}"
+    elif job.category == "SUMMARY":
+        base_message_telegram = transform_summary_message(job.translated_text, for_discord=False)
+        base_message_discord = transform_summary_message(job.translated_text, for_discord=True)
+        job.telegram_text = route.telegram_template.format(text=base_message_telegram, source=source_username)
+        job.discord_text = route.discord_template.format(text=base_message_discord, source=source_username)
+    else:
+        job.telegram_text = route.telegram_template.format(text=job.translated_text, source=source_username)
+        job.discord_text = route.discord_template.format(text=job.translated_text, source=source_username)
+    return job
+
+async def prepare_image(client, media):
+    """
+    Menyiapkan satu gambar untuk Discord memakai cache media beralamat konten.
+    
+    Foto yang sudah dikenal tidak diunduh lagi; isi yang identik tidak diproses ulang.
+    
+    Args:
+        client: Objek TelegramClient.
+        media: Media foto Telegram.
+    
+    Returns:
+        tuple: (hash isi, bytes siap unggah).
+    """
+    photo_key = media_cache.photo_key(media)
+    cached = media_cache.lookup_photo(photo_key)
+    if cached is not None:
+        return cached
+    raw = await client.download_media(media, file=bytes)
+    digest = media_cache.digest(raw)
+    data = media_cache.lookup_content(digest)
+    if data is None:
+        # Perkecil dan encode ulang di process pool sebelum diunggah
+        data = await image_processor.process(raw)
+    media_cache.put(photo_key, digest, data)
+    return digest, data
+
+async def dispatch_stage(job):
+    """
+    Tahap dispatch: memasukkan pesan ke antrian pengirim Telegram dan antrian Discord.
+
+    Pengiriman Telegram berjalan di pekerja tersendiri sehingga FloodWait tidak menahan
+    pipeline dan tidak membatalkan pengiriman ke Discord.
+    """
+    event = job.event
+    message = job.message
+    chat_id = job.chat_id
+
+    if job.category != "IMAGE":
+        telegram_sender.enqueue(job.telegram_text, category=job.category)
+        await send_message_to_discord_thread(job.discord_text, category=job.category, chat_id=chat_id, target=job.route.discord_target)
+        logger.info(f"Pesan {job.category} {message.id} diteruskan dari {chat_id} ke {TARGET_CHANNEL} dan antrian Discord")
+        return job
+
+    # Forward pesan bergambar ke Telegram; album dikirim sebagai satu pesan multi-media
+    parts = job.album or [message]
+    files = [part.media for part in parts]
+    telegram_sender.enqueue(job.telegram_text, file=files if job.album else message.media, category="IMAGE")
+    logger.info(f"Pesan bergambar {message.id} ({len(parts)} media) dari {chat_id} masuk antrian {TARGET_CHANNEL}")
+
+    if job.saturated:
+        await send_message_to_discord_thread(job.discord_text, category="IMAGE", chat_id=chat_id, target=job.route.discord_target)
+        return job
+
+    # Unduh semua gambar secara paralel langsung ke memori untuk satu postingan Discord
+    try:
+        prepared = await asyncio.gather(*(prepare_image(event.client, media) for media in files))
+        media_keys = [digest for digest, _ in prepared]
+        media = [data for _, data in prepared]
+        await send_message_to_discord_thread(
+            job.discord_text, category="IMAGE", chat_id=chat_id, target=job.route.discord_target,
+            media=media, media_keys=media_keys
+        )
+        logger.info(f"Pesan bergambar {message.id} ({len(media)} media) dikirim ke antrian Discord dari {chat_id}")
+    except Exception as e:
+        logger.error(f"Gagal mengunduh atau mengirim gambar ke Discord: {str(e)}")
+        await failed_message_queue.put((job.discord_text, f"Gagal mengunduh gambar: {str(e)}"))
+    return job
+
+async def notify_forward_error(job, stage_name, error):
+    """
+    Memberi tahu admin saat salah satu tahap pipeline gagal memproses pesan.
+    """
+    message = job.message
+    source_username = job.source_username or f"Channel ID: {job.chat_id}"
+    logger.critical(f"Gagal memproses pesan {message.id} di tahap {stage_name}: {str(error)}")
+    for admin in ADMINS:
+        try:
+            await job.event.client.send_message(int(admin), f"Galat memproses pesan {message.id} dari {source_username}: {str(error)}\nTeks: {message.text}")
+        except Exception as send_error:
+            logger.error(f"Gagal mengirim pesan ke admin {admin}: {str(send_error)}")
+
+forward_pipeline = Pipeline(
+    "forward",
+    [
+        Stage("ingest", ingest_stage, workers=PIPELINE_WORKERS, queue_size=PIPELINE_QUEUE_SIZE),
+        Stage("classify", classify_stage, workers=PIPELINE_WORKERS, queue_size=PIPELINE_QUEUE_SIZE),
+        Stage("translate", translate_stage, workers=PIPELINE_TRANSLATE_WORKERS, queue_size=PIPELINE_QUEUE_SIZE),
+        Stage("render", render_stage, workers=PIPELINE_WORKERS, queue_size=PIPELINE_QUEUE_SIZE),
+        Stage("dispatch", dispatch_stage, workers=PIPELINE_WORKERS, queue_size=PIPELINE_QUEUE_SIZE),
+    ],
+    on_error=notify_forward_error,
+)
+
 async def forward_message(event):
     """
     Meneruskan pesan dari channel sumber ke target berdasarkan aturan.
     
+    Pesan dimasukkan ke pipeline bertahap (ingest -> classify -> translate -> render -> dispatch).
+    Urutan pesan per channel sumber tetap terjaga, sedangkan channel berbeda diproses paralel.
+    
     Args:
         event: Event dari Telethon yang berisi pesan baru.
     """
-    try:
-        message = event.message
-        chat_id = event.chat_id
-        message_id = message.id
-        
-        # Buat ID unik untuk pesan
-        unique_id = f"{chat_id}:{message_id}"
-        if unique_id in processed_messages:
-            logger.debug(f"Pesan {unique_id} sudah diproses, dilewati.")
-            return
-        
-        # Tambahkan ke deque
-        processed_messages.append(unique_id)
-        
-        source_username = f"@{event.chat.username}" if event.chat.username else f"Channel ID: {chat_id}"
-        logger.info(f"Memproses pesan {message.id} dari {chat_id}: {message.text}")
-
-        # Tangani pesan bergambar dari IMAGE_CHANNELS
-        if chat_id in IMAGE_CHANNELS and message.media and isinstance(message.media, MessageMediaPhoto):
-            translated_text = ""
-            if message.text:
-                translated_text = await translate_text(message.text.strip())
-                translated_text = remove_markdown(translated_text)  # Hapus markdown
-            else:
-                translated_text = ""
-
-            # Forward pesan bergambar ke Telegram
-            final_message_telegram = f"{translated_text} - {source_username}" if translated_text else f"- {source_username}"
-            await event.client.send_message(TARGET_CHANNEL, file=message.media, message=final_message_telegram)
-            logger.info(f"Pesan bergambar {message.id} diteruskan dari {chat_id} ke {TARGET_CHANNEL}")
-            
-            # Simpan gambar sementara untuk Discord
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".jpg")
-            media_path = temp_file.name
-            try:
-                await event.client.download_media(message.media, media_path)
-                final_message_discord = f"## {translated_text} - {source_username}" if translated_text else f"- {source_username}"
-                await send_message_to_discord_thread(final_message_discord, media_path=media_path)
-                logger.info(f"Pesan bergambar {message.id} dikirim ke antrian Discord dari {chat_id}")
-            except Exception as e:
-                logger.error(f"Gagal mengunduh atau mengirim gambar ke Discord: {str(e)}")
-                await failed_message_queue.put((final_message_discord, f"Gagal mengunduh gambar: {str(e)}"))
-            finally:
-                temp_file.close()
+    message = event.message
+    if message.grouped_id and isinstance(message.media, MessageMediaPhoto):
+        route = routing_table.lookup(event.chat_id, True)
+        if route is not None and route.category == "IMAGE":
+            album_aggregator.add(event)
             return
+    await forward_pipeline.submit(event.chat_id, ForwardJob(event, message, event.chat_id))
 
-        # Tangani pesan teks seperti sebelumnya
-        translated_text = message.text
-        if message.text:
-            translated_text = await translate_text(message.text.strip())
-        else:
-            translated_text = "(Tidak ada teks)"
-
-        if chat_id in SUMMARY_CHANNELS:
-            if message.text and contains_keyword(message.text, SUMMARY_KEYWORDS):
-                base_message_telegram = transform_summary_message(translated_text, for_discord=False)
-                base_message_discord = transform_summary_message(translated_text, for_discord=True)
-                final_message_telegram = f"{base_message_telegram} - {source_username}"
-                final_message_discord = f"### {base_message_discord} - {source_username}"
-                await event.client.send_message(TARGET_CHANNEL, final_message_telegram)
-                await send_message_to_discord_thread(final_message_discord)
-                logger.info(f"Pesan ringkasan {message.id} diteruskan dari {chat_id} ke {TARGET_CHANNEL} dan antrian Discord")
-            else:
-                logger.info(f"Pesan dari {chat_id} tidak mengandung summary keywords: {message.text}")
-        else:
-            base_message = translated_text
-            if chat_id in VIP_CHANNELS:
-                final_message_telegram = f"**{base_message} - {source_username}**"
-                final_message_discord = f"### {base_message} - {source_username}"
-                await event.client.send_message(TARGET_CHANNEL, final_message_telegram)
-                await send_message_to_discord_thread(final_message_discord)
-                logger.info(f"Pesan VIP {message.id} diteruskan dari {chat_id} ke {TARGET_CHANNEL} dan antrian Discord")
-            
-            elif chat_id in FILTERED_CHANNELS:
-                if message.text and contains_keyword(message.text, KEYWORDS):
-                    final_message_telegram = f"{base_message} - {source_username}"
-                    final_message_discord = f"### {base_message} - {source_username}"
-                    await event.client.send_message(TARGET_CHANNEL, final_message_telegram)
-                    await send_message_to_discord_thread(final_message_discord)
-                    logger.info(f"Pesan {message.id} diteruskan dari {chat_id} ke {TARGET_CHANNEL} dan antrian Discord")
-                else:
-                    logger.info(f"Pesan dari {chat_id} tidak mengandung kata kunci: {message.text}")
-            
-            elif chat_id in UNFILTERED_CHANNELS:
-                final_message_telegram = f"{base_message} - {source_username}"
-                final_message_discord = f"{base_message} - {source_username}"
-                await event.client.send_message(TARGET_CHANNEL, final_message_telegram)
-                await send_message_to_discord_thread(final_message_discord)
-                logger.info(f"Pesan {message.id} diteruskan dari {chat_id} ke {TARGET_CHANNEL} dan antrian Discord")
+async def forward_album(events):
+    """
+    Memasukkan satu album yang sudah dikumpulkan ke pipeline sebagai satu job.
     
-    except Exception as e:
-        logger.critical(f"Gagal memproses pesan {message.id}: {str(e)}")
-        for admin in ADMINS:
-            try:
-                await event.client.send_message(int(admin), f"Galat memproses pesan {message.id} dari {source_username}: {str(e)}\nTeks: {message.text}")
-            except Exception as send_error:
-                logger.error(f"Gagal mengirim pesan ke admin {admin}: {str(send_error)}")
+    Args:
+        events (list): Event semua bagian album, urut ID pesan.
+    """
+    first = events[0]
+    await forward_pipeline.submit(first.chat_id, ForwardJob(first, first.message, first.chat_id, album=[e.message for e in events]))
+
+album_aggregator = AlbumAggregator(forward_album)
+
+async def render_channel_list(client, channel_ids):
+    """
+    Menyusun daftar bernomor channel dari cache entitas dalam satu kali lintasan.
+    
+    Args:
+        client: Objek TelegramClient.
+        channel_ids (list): Daftar ID channel.
+    
+    Returns:
+        str: Baris daftar channel.
+    """
+    usernames = await entity_cache.usernames(client, channel_ids)
+    list_str = ""
+    for i, channel_id in enumerate(channel_ids):
+        if channel_id in usernames:
+            name = usernames[channel_id] or f"Channel ID: {channel_id}"
+            list_str += f"{i+1}. @{name}\n"
+        else:
+            list_str += f"{i+1}. Channel ID: {channel_id} (tidak dapat diambil)\n"
+    return list_str
 
 async def update_channel_list(event, channel_list, list_name, action, channel_name):
     """
@@ -179,15 +366,8 @@ async def update_channel_list(event, channel_list, list_name, action, channel_na
         action: 'add' atau 'remove'.
         channel_name: Nama atau ID channel.
     """
-    if event.sender_id not in ADMINS:
-        await event.reply("Kamu tidak berwenang menggunakan perintah ini.")
-        return
-    
     try:
-        entity = await event.client.get_entity(channel_name)
-        channel_id = entity.id
-        if channel_id > 0:
-            channel_id = -1000000000000 - channel_id
+        channel_id = await entity_cache.resolve(event.client, channel_name)
         
         if action == "add" and channel_id not in channel_list:
             channel_list.append(channel_id)
@@ -202,14 +382,7 @@ async def update_channel_list(event, channel_list, list_name, action, channel_na
             await event.reply(message)
             return
         
-        with open('channels.json', 'w') as f:
-            json.dump({
-                'FILTERED_CHANNELS': FILTERED_CHANNELS,
-                'UNFILTERED_CHANNELS': UNFILTERED_CHANNELS,
-                'VIP_CHANNELS': VIP_CHANNELS,
-                'SUMMARY_CHANNELS': SUMMARY_CHANNELS,
-                'IMAGE_CHANNELS': IMAGE_CHANNELS
-            }, f)
+        config_store.save('channels.json')
         await event.reply(message)
         await update_monitored_chats(event.client)
     except Exception as e:
@@ -230,19 +403,9 @@ async def remove_image_channel(event):
 
 # Handler perintah admin untuk menampilkan daftar IMAGE_CHANNELS
 async def list_image_channel(event):
-    if event.sender_id not in ADMINS:
-        await event.reply("Kamu tidak berwenang menggunakan perintah ini.")
-        return
-    
     if IMAGE_CHANNELS:
         list_str = "Daftar Channel Gambar:\n"
-        for i, channel_id in enumerate(IMAGE_CHANNELS):
-            try:
-                entity = await event.client.get_entity(channel_id)
-                name = entity.username or f"Channel ID: {channel_id}"
-                list_str += f"{i+1}. @{name}\n"
-            except Exception:
-                list_str += f"{i+1}. Channel ID: {channel_id} (tidak dapat diambil)\n"
+        list_str += await render_channel_list(event.client, IMAGE_CHANNELS)
         await event.reply(f"```\n{list_str}\n```")
     else:
         await event.reply("Tidak ada channel di IMAGE_CHANNELS.")
@@ -261,34 +424,20 @@ async def remove_summary_channel(event):
 
 # Handler perintah admin untuk menampilkan daftar SUMMARY_CHANNELS
 async def list_summary_channel(event):
-    if event.sender_id not in ADMINS:
-        await event.reply("Kamu tidak berwenang menggunakan perintah ini.")
-        return
-    
     if SUMMARY_CHANNELS:
         list_str = "Daftar Channel Summary:\n"
-        for i, channel_id in enumerate(SUMMARY_CHANNELS):
-            try:
-                entity = await event.client.get_entity(channel_id)
-                name = entity.username or f"Channel ID: {channel_id}"
-                list_str += f"{i+1}. @{name}\n"
-            except Exception:
-                list_str += f"{i+1}. Channel ID: {channel_id} (tidak dapat diambil)\n"
+        list_str += await render_channel_list(event.client, SUMMARY_CHANNELS)
         await event.reply(f"```\n{list_str}\n```")
     else:
         await event.reply("Tidak ada channel di SUMMARY_CHANNELS.")
 
 # Handler perintah admin untuk menambah keyword ke SUMMARY_KEYWORDS
 async def add_keyword_summary(event):
-    if event.sender_id not in ADMINS:
-        await event.reply("Kamu tidak berwenang menggunakan perintah ini.")
-        return
-    
     keyword = event.pattern_match.group(1).strip()
     if keyword not in SUMMARY_KEYWORDS:
         SUMMARY_KEYWORDS.append(keyword)
-        with open('summary_keywords.json', 'w') as f:
-            json.dump({'SUMMARY_KEYWORDS': SUMMARY_KEYWORDS}, f)
+        summary_keyword_matcher.add(keyword)
+        config_store.save('summary_keywords.json')
         await event.reply(f"Kata kunci summary {keyword} ditambahkan.")
         logger.info(f"Kata kunci summary {keyword} ditambahkan: {SUMMARY_KEYWORDS}")
     else:
@@ -296,15 +445,11 @@ async def add_keyword_summary(event):
 
 # Handler perintah admin untuk menghapus keyword dari SUMMARY_KEYWORDS
 async def remove_keyword_summary(event):
-    if event.sender_id not in ADMINS:
-        await event.reply("Kamu tidak berwenang menggunakan perintah ini.")
-        return
-    
     keyword = event.pattern_match.group(1).strip()
     if keyword in SUMMARY_KEYWORDS:
         SUMMARY_KEYWORDS.remove(keyword)
-        with open('summary_keywords.json', 'w') as f:
-            json.dump({'SUMMARY_KEYWORDS': SUMMARY_KEYWORDS}, f)
+        summary_keyword_matcher.reset(SUMMARY_KEYWORDS)
+        config_store.save('summary_keywords.json')
         await event.reply(f"Kata kunci summary {keyword} dihapus.")
         logger.info(f"Kata kunci summary {keyword} dihapus: {SUMMARY_KEYWORDS}")
     else:
@@ -312,10 +457,6 @@ async def remove_keyword_summary(event):
 
 # Handler perintah admin untuk menampilkan daftar SUMMARY_KEYWORDS
 async def list_keyword_summary(event):
-    if event.sender_id not in ADMINS:
-        await event.reply("Kamu tidak berwenang menggunakan perintah ini.")
-        return
-    
     if SUMMARY_KEYWORDS:
         list_str = "Daftar Kata Kunci Summary:\n"
         list_str += "\n".join([f"{i+1}. {keyword}" for i, keyword in enumerate(SUMMARY_KEYWORDS)])
@@ -337,15 +478,11 @@ async def add_unfilter_channel(event):
 
 # Handler perintah admin untuk menambah kata kunci
 async def add_keyword(event):
-    if event.sender_id not in ADMINS:
-        await event.reply("Kamu tidak berwenang menggunakan perintah ini.")
-        return
-    
     keyword = event.pattern_match.group(1).strip()
     if keyword not in KEYWORDS:
         KEYWORDS.append(keyword)
-        with open('keywords.json', 'w') as f:
-            json.dump({'KEYWORDS': KEYWORDS}, f)
+        keyword_matcher.add(keyword)
+        config_store.save('keywords.json')
         await event.reply(f"Kata kunci {keyword} ditambahkan.")
         logger.info(f"Kata kunci {keyword} ditambahkan: {KEYWORDS}")
     else:
@@ -365,15 +502,11 @@ async def remove_unfilter_channel(event):
 
 # Handler perintah admin untuk menghapus kata kunci
 async def remove_keyword(event):
-    if event.sender_id not in ADMINS:
-        await event.reply("Kamu tidak berwenang menggunakan perintah ini.")
-        return
-    
     keyword = event.pattern_match.group(1).strip()
     if keyword in KEYWORDS:
         KEYWORDS.remove(keyword)
-        with open('keywords.json', 'w') as f:
-            json.dump({'KEYWORDS': KEYWORDS}, f)
+        keyword_matcher.reset(KEYWORDS)
+        config_store.save('keywords.json')
         await event.reply(f"Kata kunci {keyword} dihapus.")
         logger.info(f"Kata kunci {keyword} dihapus: {KEYWORDS}")
     else:
@@ -381,48 +514,24 @@ async def remove_keyword(event):
 
 # Handler perintah admin untuk menampilkan daftar FILTERED_CHANNELS
 async def list_filter_channel(event):
-    if event.sender_id not in ADMINS:
-        await event.reply("Kamu tidak berwenang menggunakan perintah ini.")
-        return
-    
     if FILTERED_CHANNELS:
         list_str = "Daftar Channel Filter:\n"
-        for i, channel_id in enumerate(FILTERED_CHANNELS):
-            try:
-                entity = await event.client.get_entity(channel_id)
-                name = entity.username or f"Channel ID: {channel_id}"
-                list_str += f"{i+1}. @{name}\n"
-            except Exception:
-                list_str += f"{i+1}. Channel ID: {channel_id} (tidak dapat diambil)\n"
+        list_str += await render_channel_list(event.client, FILTERED_CHANNELS)
         await event.reply(f"```\n{list_str}\n```")
     else:
         await event.reply("Tidak ada channel di FILTERED_CHANNELS.")
 
 # Handler perintah admin untuk menampilkan daftar UNFILTERED_CHANNELS
 async def list_unfilter_channel(event):
-    if event.sender_id not in ADMINS:
-        await event.reply("Kamu tidak berwenang menggunakan perintah ini.")
-        return
-    
     if UNFILTERED_CHANNELS:
         list_str = "Daftar Channel Tanpa Filter:\n"
-        for i, channel_id in enumerate(UNFILTERED_CHANNELS):
-            try:
-                entity = await event.client.get_entity(channel_id)
-                name = entity.username or f"Channel ID: {channel_id}"
-                list_str += f"{i+1}. @{name}\n"
-            except Exception:
-                list_str += f"{i+1}. Channel ID: {channel_id} (tidak dapat diambil)\n"
+        list_str += await render_channel_list(event.client, UNFILTERED_CHANNELS)
         await event.reply(f"```\n{list_str}\n```")
     else:
         await event.reply("Tidak ada channel di UNFILTERED_CHANNELS.")
 
 # Handler perintah admin untuk menampilkan daftar kata kunci
 async def list_keyword(event):
-    if event.sender_id not in ADMINS:
-        await event.reply("Kamu tidak berwenang menggunakan perintah ini.")
-        return
-    
     if KEYWORDS:
         list_str = "Daftar Kata Kunci:\n"
         list_str += "\n".join([f"{i+1}. {keyword}" for i, keyword in enumerate(KEYWORDS)])
@@ -438,19 +547,9 @@ async def add_vip_channel(event):
 
 # Handler perintah admin untuk menampilkan daftar VIP_CHANNELS
 async def list_vip_channel(event):
-    if event.sender_id not in ADMINS:
-        await event.reply("Kamu tidak berwenang menggunakan perintah ini.")
-        return
-    
     if VIP_CHANNELS:
         list_str = "Daftar Channel VIP:\n"
-        for i, channel_id in enumerate(VIP_CHANNELS):
-            try:
-                entity = await event.client.get_entity(channel_id)
-                name = entity.username or f"Channel ID: {channel_id}"
-                list_str += f"{i+1}. @{name}\n"
-            except Exception:
-                list_str += f"{i+1}. Channel ID: {channel_id} (tidak dapat diambil)\n"
+        list_str += await render_channel_list(event.client, VIP_CHANNELS)
         await event.reply(f"```\n{list_str}\n```")
     else:
         await event.reply("Tidak ada channel di VIP_CHANNELS.")
@@ -460,3 +559,111 @@ async def remove_vip_channel(event):
     input_str = event.pattern_match.group(1)
     channel_name = extract_username(input_str)
     await update_channel_list(event, VIP_CHANNELS, "VIP_CHANNELS", "remove", channel_name)
+
+
+# Handler perintah admin untuk menampilkan statistik performa bot
+# Batas panjang satu pesan Telegram
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+def split_lines(text, limit):
+    """
+    Memecah teks menjadi beberapa bagian per baris agar setiap bagian tidak melebihi `limit` karakter.
+
+    Args:
+        text (str): Teks yang akan dipecah.
+        limit (int): Panjang maksimum setiap bagian.
+
+    Returns:
+        list: Daftar bagian teks.
+    """
+    chunks = []
+    current = ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        if len(current) + len(line) > limit:
+            chunks.append(current)
+            current = ""
+        current += line
+    if current:
+        chunks.append(current)
+    return chunks
+
+async def show_stats(event):
+    cache_stats = translation_cache.stats()
+    list_str = "Statistik Bot:\n"
+    list_str += (
+        f"Cache terjemahan: hit memori={cache_stats['memory_hits']}, hit disk={cache_stats['disk_hits']}, "
+        f"miss={cache_stats['misses']}, rasio hit={cache_stats['hit_rate']:.1f}%, "
+        f"hemat={cache_stats['saved_seconds']:.1f} detik, entri memori={cache_stats['memory_entries']}\n"
+    )
+    for provider in translation_router.stats():
+        p90 = f"{provider['p90']:.2f}s" if provider['p90'] is not None else "-"
+        list_str += (
+            f"Penyedia {provider['name']}: status={provider['state']}, latensi={provider['ewma_latency']:.2f}s, "
+            f"p90={p90}, rasio galat={provider['error_rate']:.0%}, sukses={provider['successes']}, gagal={provider['failures']}\n"
+        )
+    list_str += f"Permintaan hedging: {translation_router.hedges}\n"
+    detection_stats = language_detector.stats()
+    list_str += (
+        f"Deteksi bahasa: hit cache={detection_stats['cache_hits']}, jalur cepat={detection_stats['fast_path']}, "
+        f"fallback langdetect={detection_stats['fallback']}, gagal={detection_stats['failed']}\n"
+    )
+    rate_limit_stats = rate_limiter.stats()
+    list_str += f"Rate limit Discord: respons 429={rate_limit_stats['rate_limited']}, total tunggu={rate_limit_stats['waited_seconds']:.1f} detik\n"
+    for destination in destinations.values():
+        list_str += (
+            f"Tujuan Discord {destination.name}: antrian={destination.queue.qsize()}, terkirim={destination.sent}, "
+            f"di-spill={destination.queue.spilled} (tertunda {len(destination.spilled)}), dibuang={destination.dropped}\n"
+        )
+        for tier_name, tier_stats in destination.queue.stats().items():
+            if tier_stats['queued'] or tier_stats['dequeued'] or tier_stats['shed']:
+                list_str += (
+                    f"  {tier_name}: antre={tier_stats['queued']}, keluar={tier_stats['dequeued']}, dibuang={tier_stats['shed']}, "
+                    f"tunggu rata-rata={tier_stats['avg_wait']:.1f}s, p95={tier_stats['p95_wait']:.1f}s, maks={tier_stats['max_wait']:.1f}s\n"
+                )
+    list_str += f"Pesan Discord tanpa lampiran (backpressure): {degraded_messages}\n"
+    dedup_stats = dedup_store.stats()
+    list_str += f"Deduplikasi: {dedup_stats['size']}/{dedup_stats['max_size']} kunci, duplikat dilewati={dedup_stats['duplicates']}\n"
+    list_str += f"Konfigurasi: versi {config_store.version}, dimuat ulang dari disk={config_store.reloads}\n"
+    album_stats = album_aggregator.stats()
+    list_str += f"Album: {album_stats['albums']} album ({album_stats['parts']} media), menunggu={album_stats['pending']}\n"
+    image_stats = image_processor.stats()
+    if image_stats['enabled']:
+        saved = image_stats['bytes_before'] - image_stats['bytes_after']
+        list_str += (
+            f"Kompresi gambar: {image_stats['processed']} gambar, {image_stats['bytes_before'] / 1024 / 1024:.1f} -> "
+            f"{image_stats['bytes_after'] / 1024 / 1024:.1f} MB (hemat {saved / 1024 / 1024:.1f} MB), "
+            f"rata-rata={image_stats['avg_seconds']:.2f}s, gagal={image_stats['failed']}\n"
+        )
+    cache_stats = media_cache.stats()
+    list_str += (
+        f"Cache media: {cache_stats['entries']} gambar, {cache_stats['size'] / 1024 / 1024:.1f}/{cache_stats['max_bytes'] / 1024 / 1024:.1f} MB, "
+        f"hit foto={cache_stats['photo_hits']}, hit isi={cache_stats['content_hits']}, URL dipakai ulang={cache_stats['url_hits']}, "
+        f"miss={cache_stats['misses']}, unduhan dihemat={cache_stats['bytes_saved'] / 1024 / 1024:.1f} MB\n"
+    )
+    media_stats = media_buffer.stats()
+    list_str += f"Media di memori: {media_stats['in_memory'] / 1024 / 1024:.1f}/{media_stats['budget'] / 1024 / 1024:.1f} MB, di-spill ke disk={media_stats['spilled']}\n"
+    entity_stats = entity_cache.stats()
+    list_str += f"Cache entitas: {entity_stats['size']} channel, hit={entity_stats['hits']}, miss={entity_stats['misses']}\n"
+    near_dup_stats = near_duplicate_detector.stats()
+    list_str += f"Berita hampir sama: diperiksa={near_dup_stats['checked']}, ditekan={near_dup_stats['suppressed']}, jendela={near_dup_stats['window_size']}, ambang={near_dup_stats['threshold']}\n"
+    sender_stats = telegram_sender.stats()
+    list_str += (
+        f"Pengirim Telegram: antrian={sender_stats['queued']}, terkirim={sender_stats['sent']}, gagal={sender_stats['failed']}, "
+        f"FloodWait={sender_stats['flood_waits']}x ({sender_stats['flood_wait_seconds']}s)\n"
+    )
+    pipeline_stats = forward_pipeline.stats()
+    list_str += f"Pipeline: selesai={pipeline_stats['completed']}, latensi rata-rata={pipeline_stats['avg_latency']:.2f}s, p95={pipeline_stats['p95_latency']:.2f}s\n"
+    for stage in pipeline_stats['stages']:
+        list_str += (
+            f"  {stage['name']}: pekerja={stage['busy']}/{stage['workers']}, antrian={stage['depth']}, diproses={stage['processed']}, "
+            f"berhenti={stage['dropped']}, gagal={stage['failed']}, rata-rata={stage['avg']:.2f}s, p95={stage['p95']:.2f}s\n"
+        )
+    # Statistik bisa melebihi batas pesan Telegram jika tujuan Discord banyak; kirim per bagian
+    for chunk in split_lines(list_str, TELEGRAM_MESSAGE_LIMIT - len("```\n\n```")):
+        await event.reply(f"```\n{chunk}\n```")
@@ -0,0 +1,143 @@
+# telegram_sender.py
+import asyncio
+import time
+from dataclasses import dataclass
+from telethon.errors import FloodWaitError, BadRequestError, ForbiddenError, UnauthorizedError
+from config import TARGET_CHANNEL, TELEGRAM_SEND_RATE, logger
+from priority_queue import TieredQueue, DEFAULT_TIER, tier_for_category
+
+# Galat yang tidak akan berhasil jika diulang (pesan terlalu panjang, tidak boleh menulis, dll.)
+NON_RETRYABLE_ERRORS = (BadRequestError, ForbiddenError, UnauthorizedError)
+
+@dataclass
+class TelegramMessage:
+    """
+    Item antrian pengiriman ke channel Telegram target.
+    """
+    text: str
+    file: object = None  # Media atau daftar media (album)
+    tier: int = DEFAULT_TIER
+    attempts: int = 0
+    enqueued_at: float = 0.0
+
+class TelegramSender:
+    """
+    Pekerja pengiriman tunggal ke TARGET_CHANNEL dengan antrian prioritas sendiri.
+
+    Pipeline penerusan hanya memasukkan pesan ke antrian sehingga tidak pernah menunggu
+    latensi Telegram. Pekerja menjaga jeda minimum antar pengiriman dan, saat terkena
+    FloodWait, berhenti selama durasi yang diminta Telegram lalu mencoba lagi pesan yang
+    sama, sehingga pesan tidak hilang dan admin tidak dibanjiri notifikasi galat.
+    Galat yang tidak bisa diulang langsung dianggap gagal; setiap kegagalan permanen
+    dimasukkan ke `failed_queue` sebagai (teks, alasan) untuk diberitahukan ke admin.
+    """
+
+    def __init__(self, target=TARGET_CHANNEL, rate=TELEGRAM_SEND_RATE, max_retries=3):
+        """
+        Args:
+            target: Channel Telegram tujuan.
+            rate (int): Jumlah pesan maksimum per menit (0 = tanpa batas klien).
+            max_retries (int): Maksimum percobaan untuk galat selain FloodWait.
+        """
+        self.target = target
+        self.min_interval = 60.0 / rate if rate else 0.0
+        self.max_retries = max_retries
+        self.queue = TieredQueue()
+        self.failed_queue = asyncio.Queue()
+        self._next_send = 0.0
+        self._task = None
+        self.sent = 0
+        self.failed = 0
+        self.flood_waits = 0
+        self.flood_wait_seconds = 0
+
+    def enqueue(self, text, file=None, category=None):
+        """
+        Memasukkan pesan ke antrian tanpa menunggu pengiriman.
+
+        Args:
+            text (str): Teks atau caption pesan.
+            file (optional): Media Telegram atau daftar media untuk album.
+            category (str, optional): Kategori channel sumber untuk prioritas.
+        """
+        self.queue.put_nowait(TelegramMessage(text, file, tier_for_category(category), enqueued_at=time.monotonic()))
+
+    def start(self, client):
+        """
+        Menjalankan pekerja pengiriman (aman dipanggil lebih dari sekali).
+
+        Args:
+            client: Objek TelegramClient.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self.run(client))
+
+    async def _pace(self):
+        delay = self._next_send - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._next_send = time.monotonic() + self.min_interval
+
+    async def _send(self, client, item):
+        while True:
+            await self._pace()
+            try:
+                if item.file is not None:
+                    await client.send_message(self.target, item.text, file=item.file)
+                else:
+                    await client.send_message(self.target, item.text)
+                return True
+            except FloodWaitError as e:
+                # Hormati durasi FloodWait untuk semua pesan berikutnya, lalu coba lagi pesan ini
+                self.flood_waits += 1
+                self.flood_wait_seconds += e.seconds
+                logger.warning(f"FloodWait Telegram {e.seconds} detik, pengiriman ke {self.target} dijeda ({self.queue.qsize()} pesan mengantre)")
+                self._next_send = time.monotonic() + e.seconds + 1
+            except NON_RETRYABLE_ERRORS as e:
+                reason = f"{type(e).__name__}: {str(e)}"
+                logger.critical(f"Gagal mengirim pesan ke {self.target}, tidak dicoba ulang: {reason} - {item.text[:50]}...")
+                await self.failed_queue.put((item.text, reason))
+                return False
+            except Exception as e:
+                item.attempts += 1
+                if item.attempts > self.max_retries:
+                    reason = f"Gagal setelah {self.max_retries} percobaan: {type(e).__name__}: {str(e)}"
+                    logger.critical(f"Gagal mengirim pesan ke {self.target}: {reason} - {item.text[:50]}...")
+                    await self.failed_queue.put((item.text, reason))
+                    return False
+                logger.error(f"Gagal mengirim pesan ke {self.target} (percobaan {item.attempts}): {str(e)}")
+                self._next_send = time.monotonic() + 2 ** item.attempts
+
+    async def run(self, client):
+        """
+        Loop pekerja: mengambil pesan sesuai prioritas kategori lalu mengirimkannya.
+
+        Args:
+            client: Objek TelegramClient.
+        """
+        while True:
+            item = await self.queue.get()
+            try:
+                if await self._send(client, item):
+                    self.sent += 1
+                    logger.info(f"Pesan dikirim ke {self.target} setelah {time.monotonic() - item.enqueued_at:.2f}s di antrian: {item.text[:50]}...")
+                else:
+                    self.failed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.critical(f"Galat pekerja pengirim Telegram: {str(e)}")
+                await self.failed_queue.put((item.text, f"Galat pekerja pengirim: {str(e)}"))
+            finally:
+                self.queue.task_done()
+
+    def stats(self):
+        return {
+            'queued': self.queue.qsize(),
+            'sent': self.sent,
+            'failed': self.failed,
+            'flood_waits': self.flood_waits,
+            'flood_wait_seconds': self.flood_wait_seconds,
+            'tiers': self.queue.stats(),
+        }
+
+telegram_sender = TelegramSender()
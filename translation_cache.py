@@ -0,0 +1,176 @@
+# translation_cache.py
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from config import TRANSLATION_CACHE_SIZE, TRANSLATION_CACHE_TTL, TRANSLATION_CACHE_PATH, logger
+
+def normalize_text(text):
+    """
+    Menormalkan teks sebelum dijadikan kunci cache (spasi berlebih dihapus).
+
+    Args:
+        text (str): Teks asli.
+
+    Returns:
+        str: Teks yang telah dinormalkan.
+    """
+    return re.sub(r'\s+', ' ', text).strip()
+
+class TranslationCache:
+    """
+    Cache terjemahan dua tingkat: LRU di memori dan SQLite di disk.
+
+    Kunci berupa hash SHA-256 dari teks yang dinormalkan ditambah bahasa target.
+    Setiap entri memiliki TTL; entri kedaluwarsa dan entri tertua di luar batas
+    disk dibuang secara berkala.
+    """
+
+    def __init__(self, max_size=TRANSLATION_CACHE_SIZE, ttl=TRANSLATION_CACHE_TTL, path=TRANSLATION_CACHE_PATH, disk_max_entries=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.disk_max_entries = disk_max_entries or max_size * 25
+        self._memory = OrderedDict()  # key -> (translation, expires_at, latency)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._writes_since_purge = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def make_key(text, target_lang):
+        normalized = normalize_text(text)
+        return hashlib.sha256(f"{target_lang}\x00{normalized}".encode('utf-8')).hexdigest()
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "key TEXT PRIMARY KEY, translation TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, latency REAL NOT NULL DEFAULT 0, created_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_created ON translations(created_at)")
+            self._conn.commit()
+        return self._conn
+
+    def _disk_get(self, key):
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT translation, expires_at, latency FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+        return row
+
+    def _disk_set(self, key, translation, expires_at, latency):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO translations (key, translation, expires_at, latency, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, translation, expires_at, latency, time.time())
+            )
+            self._writes_since_purge += 1
+            if self._writes_since_purge >= 100:
+                self._writes_since_purge = 0
+                conn.execute("DELETE FROM translations WHERE expires_at < ?", (time.time(),))
+                conn.execute(
+                    "DELETE FROM translations WHERE key IN ("
+                    "SELECT key FROM translations ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.disk_max_entries,)
+                )
+            conn.commit()
+
+    def _remember(self, key, translation, expires_at, latency):
+        self._memory[key] = (translation, expires_at, latency)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    async def get(self, text, target_lang):
+        """
+        Mengambil terjemahan dari cache (memori lalu disk).
+
+        Args:
+            text (str): Teks asli.
+            target_lang (str): Kode bahasa target.
+
+        Returns:
+            str: Terjemahan yang tersimpan, atau None jika tidak ada/kedaluwarsa.
+        """
+        key = self.make_key(text, target_lang)
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            translation, expires_at, latency = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                self.saved_seconds += latency
+                return translation
+            del self._memory[key]
+
+        try:
+            row = await asyncio.to_thread(self._disk_get, key)
+        except Exception as e:
+            logger.error(f"Gagal membaca cache terjemahan dari disk: {str(e)}")
+            row = None
+        if row is not None and row[1] > now:
+            translation, expires_at, latency = row
+            self._remember(key, translation, expires_at, latency)
+            self.disk_hits += 1
+            self.saved_seconds += latency
+            return translation
+
+        self.misses += 1
+        return None
+
+    async def set(self, text, target_lang, translation, latency=0.0):
+        """
+        Menyimpan terjemahan ke cache memori dan disk.
+
+        Args:
+            text (str): Teks asli.
+            target_lang (str): Kode bahasa target.
+            translation (str): Hasil terjemahan.
+            latency (float): Lama panggilan API terjemahan dalam detik.
+        """
+        key = self.make_key(text, target_lang)
+        expires_at = time.time() + self.ttl
+        self._remember(key, translation, expires_at, latency)
+        try:
+            await asyncio.to_thread(self._disk_set, key, translation, expires_at, latency)
+        except Exception as e:
+            logger.error(f"Gagal menulis cache terjemahan ke disk: {str(e)}")
+
+    def stats(self):
+        """
+        Mengembalikan statistik hit/miss cache.
+
+        Returns:
+            dict: Statistik cache.
+        """
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hit_rate = (self.memory_hits + self.disk_hits) / lookups * 100 if lookups else 0.0
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': hit_rate,
+            'saved_seconds': self.saved_seconds,
+            'memory_entries': len(self._memory),
+        }
+
+    def close(self):
+        """Menutup koneksi SQLite."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+translation_cache = TranslationCache()
@@ -0,0 +1,217 @@
+# translation_router.py
+import asyncio
+import time
+from collections import deque
+from config import TRANSLATION_HEDGE_ENABLED, TRANSLATION_CIRCUIT_COOLDOWN, logger
+
+class ProviderHealth:
+    """
+    Menyimpan statistik latensi, tingkat galat, dan status circuit breaker untuk satu penyedia terjemahan.
+
+    Status circuit breaker:
+        closed    - penyedia sehat dan boleh dipakai.
+        open      - penyedia dilewati sampai masa cooldown habis.
+        half_open - satu permintaan percobaan diizinkan untuk menguji pemulihan.
+    """
+
+    def __init__(self, name, func, expected_latency, failure_threshold=3, error_rate_threshold=0.5, cooldown=60, window=20):
+        self.name = name
+        self.func = func
+        self.ewma_latency = expected_latency
+        self.latencies = deque(maxlen=50)
+        self.results = deque(maxlen=window)
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+        self.successes = 0
+        self.failures = 0
+
+    @property
+    def error_rate(self):
+        if not self.results:
+            return 0.0
+        return self.results.count(False) / len(self.results)
+
+    def p90(self):
+        """
+        Mengembalikan latensi persentil ke-90, atau None jika sampel belum cukup.
+        """
+        if len(self.latencies) < 5:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+
+    def is_available(self, now):
+        if self.state == "closed":
+            return True
+        if self.state == "open" and now - self.opened_at >= self.cooldown:
+            self.state = "half_open"
+            logger.info(f"Circuit breaker {self.name} setengah terbuka, mencoba satu permintaan.")
+        return self.state == "half_open" and not self.probe_in_flight
+
+    def begin(self):
+        if self.state == "half_open":
+            self.probe_in_flight = True
+
+    def record_success(self, latency):
+        self.successes += 1
+        # Sampel pertama menggantikan perkiraan awal agar penyedia cepat segera dikenali
+        if not self.latencies:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = 0.3 * latency + 0.7 * self.ewma_latency
+        self.latencies.append(latency)
+        self.results.append(True)
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+        if self.state != "closed":
+            logger.info(f"Circuit breaker {self.name} ditutup kembali, penyedia pulih.")
+            self.state = "closed"
+
+    def record_failure(self, latency):
+        self.failures += 1
+        self.results.append(False)
+        # Kegagalan karena timeout tetap dihitung agar penyedia lambat tidak diprioritaskan
+        self.ewma_latency = 0.3 * latency + 0.7 * self.ewma_latency
+        self.consecutive_failures += 1
+        self.probe_in_flight = False
+        unhealthy = (
+            self.consecutive_failures >= self.failure_threshold
+            or (len(self.results) >= 5 and self.error_rate >= self.error_rate_threshold)
+        )
+        if self.state == "half_open" or (self.state == "closed" and unhealthy):
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            logger.warning(f"Circuit breaker {self.name} dibuka selama {self.cooldown} detik (galat beruntun: {self.consecutive_failures}, rasio galat: {self.error_rate:.0%}).")
+
+    def record_cancel(self):
+        self.probe_in_flight = False
+
+class TranslationRouter:
+    """
+    Memilih penyedia terjemahan tercepat yang sehat untuk setiap permintaan.
+
+    Penyedia diurutkan berdasarkan latensi rata-rata (EWMA). Penyedia yang circuit
+    breaker-nya terbuka dilewati. Jika hedging aktif dan penyedia pertama belum
+    menjawab setelah melewati latensi p90-nya, penyedia berikutnya dipanggil secara
+    paralel dan jawaban tercepat yang berhasil dipakai.
+    """
+
+    def __init__(self, providers, hedge_enabled=TRANSLATION_HEDGE_ENABLED, cooldown=TRANSLATION_CIRCUIT_COOLDOWN):
+        """
+        Args:
+            providers (list): Daftar (nama, fungsi async(text, target_lang)) sesuai urutan preferensi.
+            hedge_enabled (bool): Aktifkan permintaan cadangan paralel.
+            cooldown (int): Lama circuit breaker terbuka dalam detik.
+        """
+        self.providers = [
+            ProviderHealth(name, func, expected_latency=float(i + 1), cooldown=cooldown)
+            for i, (name, func) in enumerate(providers)
+        ]
+        self.hedge_enabled = hedge_enabled
+        self.hedges = 0
+
+    def _ordered_candidates(self):
+        now = time.monotonic()
+        available = [p for p in self.providers if p.is_available(now)]
+        return sorted(available, key=lambda p: p.ewma_latency)
+
+    async def _call(self, provider, text, target_lang):
+        start = time.monotonic()
+        try:
+            result = await provider.func(text, target_lang)
+        except asyncio.CancelledError:
+            provider.record_cancel()
+            raise
+        except Exception:
+            provider.record_failure(time.monotonic() - start)
+            raise
+        provider.record_success(time.monotonic() - start)
+        return result
+
+    async def translate(self, text, target_lang):
+        """
+        Menerjemahkan teks menggunakan penyedia terbaik yang tersedia.
+
+        Args:
+            text (str): Teks yang akan diterjemahkan.
+            target_lang (str): Kode bahasa target.
+
+        Returns:
+            str: Teks hasil terjemahan.
+
+        Raises:
+            RuntimeError: Jika semua penyedia gagal atau sedang tidak sehat.
+        """
+        candidates = self._ordered_candidates()
+        if not candidates:
+            raise RuntimeError("Semua penyedia terjemahan sedang tidak sehat (circuit breaker terbuka).")
+
+        errors = []
+        pending = {}  # task -> (provider, waktu mulai)
+        next_index = 0
+
+        def launch():
+            nonlocal next_index
+            provider = candidates[next_index]
+            next_index += 1
+            provider.begin()
+            task = asyncio.create_task(self._call(provider, text, target_lang))
+            pending[task] = (provider, time.monotonic())
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if self.hedge_enabled and len(pending) == 1 and next_index < len(candidates):
+                    provider, started = next(iter(pending.values()))
+                    deadline = provider.p90()
+                    if deadline is not None:
+                        timeout = max(0.0, deadline - (time.monotonic() - started))
+
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.hedges += 1
+                    logger.info(f"Penyedia {provider.name} melewati batas p90 ({deadline:.2f} detik), mengirim permintaan cadangan ke {candidates[next_index].name}.")
+                    launch()
+                    continue
+
+                for task in done:
+                    provider, _ = pending.pop(task)
+                    if task.exception() is None:
+                        logger.info(f"Terjemahan {provider.name} berhasil: {task.result()}")
+                        return task.result()
+                    logger.error(f"Terjemahan {provider.name} gagal: {str(task.exception())}")
+                    errors.append(f"{provider.name}: {task.exception()}")
+
+                if not pending and next_index < len(candidates):
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise RuntimeError(f"Semua penyedia terjemahan gagal: {'; '.join(errors)}")
+
+    def stats(self):
+        """
+        Mengembalikan statistik per penyedia.
+
+        Returns:
+            list: Daftar dict berisi nama, status, latensi, dan jumlah sukses/gagal.
+        """
+        return [
+            {
+                'name': p.name,
+                'state': p.state,
+                'ewma_latency': p.ewma_latency,
+                'p90': p.p90(),
+                'error_rate': p.error_rate,
+                'successes': p.successes,
+                'failures': p.failures,
+            }
+            for p in self.providers
+        ]
@@ -1,9 +1,12 @@
 # utils.py
 import re
+import time
 import aiohttp
-import requests
-from langdetect import detect
 from config import GOOGLE_API_KEY, logger
+from translation_cache import translation_cache
+from http_client import get_session
+from translation_router import TranslationRouter
+from language_detection import language_detector
 from telethon.errors import SessionPasswordNeededError
 
 def extract_username(input_str):
@@ -27,13 +30,120 @@ def extract_username(input_str):
         return match.group(1)
     return input_str
 
+class KeywordMatcher:
+    """
+    Pencocok kata kunci terkompilasi yang memeriksa semua kata kunci dalam satu kali pemindaian.
+
+    Semua kata kunci digabung menjadi satu regex alternasi dengan batas kata (\\b) yang
+    dikompilasi sekali. Regex hanya dibangun ulang saat daftar kata kunci berubah
+    (melalui add/remove/reset), dan pembangunan dilakukan secara malas pada pencocokan berikutnya.
+    """
+
+    def __init__(self, keywords=None):
+        self._keywords = {}  # keyword lowercase -> keyword asli
+        self._pattern = None
+        self._nested = {}  # keyword lowercase -> [(keyword lebih pendek di dalamnya, regex-nya)]
+        self._dirty = True
+        self.reset(keywords or [])
+
+    def __len__(self):
+        return len(self._keywords)
+
+    def __bool__(self):
+        return bool(self._keywords)
+
+    def reset(self, keywords):
+        """
+        Mengganti seluruh daftar kata kunci.
+
+        Args:
+            keywords (list): Daftar kata kunci baru.
+        """
+        self._keywords = {}
+        for keyword in keywords:
+            keyword_clean = str(keyword).lower().strip()
+            if keyword_clean and keyword_clean not in self._keywords:
+                self._keywords[keyword_clean] = keyword
+        self._dirty = True
+
+    def add(self, keyword):
+        """Menambahkan satu kata kunci ke pencocok."""
+        keyword_clean = str(keyword).lower().strip()
+        if keyword_clean and keyword_clean not in self._keywords:
+            self._keywords[keyword_clean] = keyword
+            self._dirty = True
+
+    def remove(self, keyword):
+        """Menghapus satu kata kunci dari pencocok."""
+        keyword_clean = str(keyword).lower().strip()
+        if self._keywords.pop(keyword_clean, None) is not None:
+            self._dirty = True
+
+    def _compile(self):
+        if self._keywords:
+            # Urutkan dari yang terpanjang agar frasa panjang didahulukan dari prefiksnya
+            alternatives = sorted(self._keywords, key=len, reverse=True)
+            self._pattern = re.compile(r'\b(?:' + '|'.join(re.escape(kw) for kw in alternatives) + r')\b')
+            # Alternasi hanya menghasilkan kecocokan terpanjang yang tidak tumpang tindih; kata kunci
+            # yang berada di dalam kata kunci lain (misalnya "etf" di "spot etf") diperiksa terpisah
+            self._nested = {}
+            for keyword in alternatives:
+                inner = [other for other in alternatives if other != keyword and other in keyword]
+                if inner:
+                    self._nested[keyword] = [(other, re.compile(r'\b' + re.escape(other) + r'\b')) for other in inner]
+        else:
+            self._pattern = None
+            self._nested = {}
+        self._dirty = False
+
+    def find_all(self, text):
+        """
+        Mencari semua kata kunci yang muncul di teks.
+
+        Args:
+            text (str): Teks yang akan diperiksa.
+
+        Returns:
+            list: Daftar kata kunci (bentuk asli) yang ditemukan, tanpa duplikasi, termasuk
+                kata kunci yang berada di dalam kecocokan kata kunci yang lebih panjang.
+        """
+        if self._dirty:
+            self._compile()
+        if not text or self._pattern is None:
+            return []
+        text = text.lower()
+        found = {}
+        for match in self._pattern.finditer(text):
+            keyword = self._keywords.get(match.group(0))
+            if keyword is None:
+                continue
+            found[keyword] = None
+            for inner, pattern in self._nested.get(match.group(0), ()):
+                if pattern.search(text, match.start(), match.end()):
+                    found[self._keywords[inner]] = None
+        return list(found)
+
+    def search(self, text):
+        """
+        Mencari kata kunci pertama yang muncul di teks.
+
+        Returns:
+            str: Kata kunci (bentuk asli) yang ditemukan, atau None.
+        """
+        if self._dirty:
+            self._compile()
+        if not text or self._pattern is None:
+            return None
+        match = self._pattern.search(text.lower())
+        return self._keywords.get(match.group(0)) if match else None
+
 def contains_keyword(text, keywords):
     """
     Memeriksa apakah teks mengandung salah satu kata kunci.
     
     Args:
         text (str): Teks yang akan diperiksa.
-        keywords (list): Daftar kata kunci.
+        keywords (KeywordMatcher | list): Pencocok kata kunci atau daftar kata kunci.
     
     Returns:
         bool: True jika kata kunci ditemukan, False jika tidak.
@@ -42,13 +152,11 @@ def contains_keyword(text, keywords):
         logger.warning("Teks atau kata kunci kosong.")
         return False
     
-    text_lower = text.lower().strip()
-    for keyword in keywords:
-        keyword_clean = keyword.lower().strip()
-        # Gunakan pencocokan kata utuh untuk menghindari false positive
-        if re.search(r'\b' + re.escape(keyword_clean) + r'\b', text_lower):
-            logger.info(f"Kata kunci '{keyword}' ditemukan di pesan: {text}")
-            return True
+    matcher = keywords if isinstance(keywords, KeywordMatcher) else KeywordMatcher(keywords)
+    matched = matcher.find_all(text)
+    if matched:
+        logger.info(f"Kata kunci {matched} ditemukan di pesan: {text}")
+        return True
     
     logger.info(f"Tidak ada kata kunci yang cocok di pesan: {text}")
     return False
@@ -119,7 +227,33 @@ def remove_markdown(text):
 
 async def translate_text(text, target_lang="id"):
     """
-    Menerjemahkan teks ke bahasa target menggunakan beberapa API terjemahan.
+    Menerjemahkan teks ke bahasa target, memeriksa cache terjemahan sebelum memanggil API.
+    
+    Args:
+        text (str): Teks yang akan diterjemahkan.
+        target_lang (str): Kode bahasa target (default: 'id').
+    
+    Returns:
+        str: Teks yang telah diterjemahkan, atau teks asli jika gagal.
+    """
+    if not text:
+        return text
+
+    cached = await translation_cache.get(text, target_lang)
+    if cached is not None:
+        logger.info(f"Terjemahan diambil dari cache: {cached}")
+        return cached
+
+    start = time.monotonic()
+    translated_text = await _translate_uncached(text, target_lang)
+    # Hanya simpan hasil terjemahan yang berhasil (bukan teks asli hasil fallback)
+    if translated_text and translated_text != text:
+        await translation_cache.set(text, target_lang, translated_text, latency=time.monotonic() - start)
+    return translated_text
+
+async def _translate_uncached(text, target_lang="id"):
+    """
+    Menerjemahkan teks ke bahasa target melalui router penyedia terjemahan.
     
     Args:
         text (str): Teks yang akan diterjemahkan.
@@ -129,93 +263,97 @@ async def translate_text(text, target_lang="id"):
         str: Teks yang telah diterjemahkan, atau teks asli jika gagal.
     """
     try:
-        if not text or detect(text) == "id":
-            logger.info(f"Teks sudah dalam bahasa Indonesia atau kosong: {text}")
+        if not text:
+            logger.info(f"Teks kosong: {text}")
             return text
-        
-        # API Utama: Wordvice AI
-        url = "https://sysapi.wordvice.ai/tools/non-member/fetch-llm-result"
-        payload = {
-            "prompt": "Translate the following English text into Indonesian.",
-            "text": text,
-            "tool": "translate"
-        }
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Linux; Android 10; K) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Mobile Safari/537.36",
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-            "accept-language": "en-US,en;q=0.9",
-            "origin": "https://wordvice.ai",
-            "referer": "https://wordvice.ai/"
-        }
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                if response.status != 200:
-                    raise Exception(f"Wordvice API error: {response.status}")
-                data = await response.json()
-                if data.get("code") == "0000":
-                    translated_text = data["result"][0]["text"]
-                    logger.info(f"Terjemahan Wordvice AI berhasil: {translated_text}")
-                    return translated_text
-                else:
-                    raise Exception(f"API error: {data.get('message')}")
-    
+        # Jika deteksi gagal (None), teks tetap dicoba diterjemahkan
+        lang = await language_detector.detect(text)
+        if lang in ("id", "unknown"):
+            logger.info(f"Teks sudah dalam bahasa Indonesia atau tidak mengandung huruf: {text}")
+            return text
+        return await translation_router.translate(text, target_lang)
     except Exception as e:
-        logger.error(f"Terjemahan Wordvice AI gagal: {str(e)}, mencoba MachineTranslation...")
-        
-        # Cadangan Pertama: MachineTranslation (Lingvanex)
-        try:
-            url = "https://api.machinetranslation.com/v1/translation/lingvanex"
-            payload = {
-                "text": text,
-                "source_language_code": "en",
-                "target_language_code": target_lang,
-                "share_id": "19bd9373-bb23-4d01-aa07-5cea4218eb37"
-            }
-            headers = {
-                'User-Agent': "Mozilla/5.0 (Linux; Android 10; K) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Mobile Safari/537.36",
-                'Accept': "application/json, text/plain, */*",
-                'Accept-Encoding': "gzip, deflate, br, zstd",
-                'Content-Type': "application/json",
-                'sec-ch-ua-platform': "\"Android\"",
-                'sec-ch-ua': "\"Brave\";v=\"135\", \"Not-A.Brand\";v=\"8\", \"Chromium\";v=\"135\"",
-                'sec-ch-ua-mobile': "?1",
-                'Sec-GPC': "1",
-                'Accept-Language': "en-US,en;q=0.5",
-                'Origin': "https://www.machinetranslation.com",
-                'Sec-Fetch-Site': "same-site",
-                'Sec-Fetch-Mode': "cors",
-                'Sec-Fetch-Dest': "empty",
-                'Referer': "https://www.machinetranslation.com/"
-            }
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                    if response.status != 200:
-                        raise Exception(f"MachineTranslation API error: {response.status}")
-                    data = await response.json()
-                    translated_text = data["response"]["translated_text"]
-                    logger.info(f"Terjemahan MachineTranslation berhasil: {translated_text}")
-                    return translated_text
-        
-        except Exception as e:
-            logger.error(f"Terjemahan MachineTranslation gagal: {str(e)}, mencoba Google Translate...")
-            
-            # Cadangan Kedua: Google Translate
-            try:
-                if GOOGLE_API_KEY:
-                    url = f"https://translation.googleapis.com/language/translate/v2?key={GOOGLE_API_KEY}"
-                    payload = {"q": text, "target": target_lang, "format": "text"}
-                    response = requests.post(url, json=payload)
-                    response.raise_for_status()
-                    translated_text = response.json()["data"]["translations"][0]["translatedText"]
-                    logger.info(f"Terjemahan Google Translate berhasil: {translated_text}")
-                    return translated_text
-                else:
-                    logger.warning("Tidak ada kunci API cadangan untuk Google Translate.")
-                    return text
-            except Exception as fallback_e:
-                logger.critical(f"Semua API terjemahan gagal: {str(fallback_e)}")
-                return text
+        logger.critical(f"Semua API terjemahan gagal: {str(e)}")
+        return text
+
+async def _translate_wordvice(text, target_lang):
+    """Penyedia terjemahan Wordvice AI."""
+    url = "https://sysapi.wordvice.ai/tools/non-member/fetch-llm-result"
+    payload = {
+        "prompt": "Translate the following English text into Indonesian.",
+        "text": text,
+        "tool": "translate"
+    }
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Linux; Android 10; K) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Mobile Safari/537.36",
+        "Accept": "application/json",
+        "Content-Type": "application/json",
+        "accept-language": "en-US,en;q=0.9",
+        "origin": "https://wordvice.ai",
+        "referer": "https://wordvice.ai/"
+    }
+    session = get_session()
+    async with session.post(url, json=payload, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
+        if response.status != 200:
+            raise Exception(f"Wordvice API error: {response.status}")
+        data = await response.json()
+        if data.get("code") == "0000":
+            return data["result"][0]["text"]
+        raise Exception(f"API error: {data.get('message')}")
+
+async def _translate_lingvanex(text, target_lang):
+    """Penyedia terjemahan MachineTranslation (Lingvanex)."""
+    url = "https://api.machinetranslation.com/v1/translation/lingvanex"
+    payload = {
+        "text": text,
+        "source_language_code": "en",
+        "target_language_code": target_lang,
+        "share_id": "19bd9373-bb23-4d01-aa07-5cea4218eb37"
+    }
+    headers = {
+        'User-Agent': "Mozilla/5.0 (Linux; Android 10; K) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/135.0.0.0 Mobile Safari/537.36",
+        'Accept': "application/json, text/plain, */*",
+        'Accept-Encoding': "gzip, deflate, br, zstd",
+        'Content-Type': "application/json",
+        'sec-ch-ua-platform': "\"Android\"",
+        'sec-ch-ua': "\"Brave\";v=\"135\", \"Not-A.Brand\";v=\"8\", \"Chromium\";v=\"135\"",
+        'sec-ch-ua-mobile': "?1",
+        'Sec-GPC': "1",
+        'Accept-Language': "en-US,en;q=0.5",
+        'Origin': "https://www.machinetranslation.com",
+        'Sec-Fetch-Site': "same-site",
+        'Sec-Fetch-Mode': "cors",
+        'Sec-Fetch-Dest': "empty",
+        'Referer': "https://www.machinetranslation.com/"
+    }
+    session = get_session()
+    async with session.post(url, json=payload, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
+        if response.status != 200:
+            raise Exception(f"MachineTranslation API error: {response.status}")
+        data = await response.json()
+        return data["response"]["translated_text"]
+
+async def _translate_google(text, target_lang):
+    """Penyedia terjemahan Google Translate (membutuhkan GOOGLE_API_KEY)."""
+    url = f"https://translation.googleapis.com/language/translate/v2?key={GOOGLE_API_KEY}"
+    payload = {"q": text, "target": target_lang, "format": "text"}
+    session = get_session()
+    async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=10)) as response:
+        response.raise_for_status()
+        data = await response.json()
+        return data["data"]["translations"][0]["translatedText"]
+
+# Urutan preferensi awal penyedia; router menyesuaikan urutan berdasarkan latensi dan kesehatan
+_translation_providers = [
+    ("Wordvice AI", _translate_wordvice),
+    ("MachineTranslation", _translate_lingvanex),
+]
+if GOOGLE_API_KEY:
+    _translation_providers.append(("Google Translate", _translate_google))
+else:
+    logger.warning("Tidak ada kunci API cadangan untuk Google Translate.")
+
+translation_router = TranslationRouter(_translation_providers)
 
 async def login(client, code_queue):
     """